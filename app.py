@@ -5,16 +5,35 @@ Convert TALIMEX Internal TSS files to Standard TSS format.
 
 import streamlit as st
 import zipfile
-import io
-import gc
+import hashlib
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
 from pathlib import Path
-from openpyxl import load_workbook
-
-# Import UI toolkit components
-from streamlit_ui_toolkit import get_tss_17column_template
+from typing import Callable, Optional
 
 # Import validation logic from step0
-from step0_validate import EXPECTED_HEADERS, HEADER_ROW, ValidationError, ValidationResult
+from step0_validate import EXPECTED_HEADERS, HEADER_ROW, ValidationError, ValidationResult, check_header_values
+
+# Streaming input reader and in-memory conversion pipeline
+from input_reader import read_header_values
+from converter import convert_bytes
+from artifact_store import ArtifactStore, default_artifact_dir, default_artifact_store_bytes
+from memory_budget import MemoryBudget, default_memory_limit, estimate_job_memory
+from build_cache import pipeline_version
+from job_manager import DONE, Job, JobManager, QueueFull, default_job_workers, default_queue_depth
+from worker_pool import (
+    WorkerPool,
+    default_job_timeout,
+    default_max_tasks,
+    default_memory_ceiling,
+    default_recycle_rss,
+)
+
+CACHE_TTL = 60 * 60                 # Seconds a cached validation/converted workbook is kept
+VALIDATION_CACHE_ENTRIES = 256
+JOB_POLL_INTERVAL = 0.5             # Seconds between reruns while jobs are running
 
 # Page config
 st.set_page_config(
@@ -110,27 +129,39 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-def validate_file_content(file_bytes: bytes, filename: str) -> ValidationResult:
-    """Validate file content without saving to disk"""
-    errors = []
+def file_digest(file_bytes: bytes) -> str:
+    """SHA-256 of an upload; cache key of its validation and conversion"""
+    return hashlib.sha256(file_bytes).hexdigest()
 
-    try:
-        wb = load_workbook(io.BytesIO(file_bytes), read_only=True, data_only=True)
-        ws = wb.active
 
-        for col_idx, expected_text in EXPECTED_HEADERS.items():
-            cell_value = ws.cell(row=HEADER_ROW, column=col_idx).value
-            actual_text = str(cell_value).strip() if cell_value else ""
+@dataclass(frozen=True)
+class Upload:
+    """Bytes and content digest of one uploaded file"""
+    name: str
+    data: bytes
+    digest: str
+
 
-            if expected_text.lower() not in actual_text.lower():
-                errors.append(ValidationError(
-                    column=col_idx,
-                    column_letter=get_column_letter(col_idx),
-                    expected=expected_text,
-                    actual=actual_text if actual_text else "(empty)"
-                ))
+def read_uploads(uploaded_files) -> list[Upload]:
+    """Read every upload once per rerun (getvalue does not consume the upload)"""
+    uploads = []
+    for uploaded_file in uploaded_files:
+        data = uploaded_file.getvalue()
+        uploads.append(Upload(uploaded_file.name, data, file_digest(data)))
+    return uploads
+
+
+@st.cache_data(max_entries=VALIDATION_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def validate_file_content(digest: str, version: str, filename: str, _file_bytes: bytes) -> ValidationResult:
+    """Validate the header row of one upload (header-only probe of the active sheet).
 
-        wb.close()
+    Cached by content digest and pipeline version; the bytes themselves are not hashed by Streamlit.
+    """
+    errors = []
+
+    try:
+        header_values = read_header_values(_file_bytes, HEADER_ROW, tuple(EXPECTED_HEADERS.keys()))
+        errors = check_header_values(header_values)
 
     except Exception as e:
         errors.append(ValidationError(
@@ -147,360 +178,320 @@ def validate_file_content(file_bytes: bytes, filename: str) -> ValidationResult:
     )
 
 
-def get_column_letter(col_idx: int) -> str:
-    """Convert column index (1-based) to letter"""
-    result = ""
-    while col_idx > 0:
-        col_idx, remainder = divmod(col_idx - 1, 26)
-        result = chr(65 + remainder) + result
-    return result
-
-
-def get_sheets_except_material_code(wb):
-    """Get all sheets except 'material code'"""
-    sheets = []
-    for sheet_name in wb.sheetnames:
-        if sheet_name.lower() != "material code":
-            sheets.append(wb[sheet_name])
-    return sheets
-
-
-def find_product_info(ws):
-    """Find Product name and Article number in first 3 rows"""
-    product_names = []
-    article_numbers = []
-
-    for row in range(1, 4):
-        for col in range(1, min(ws.max_column + 1, 20)):
-            cell_value = ws.cell(row=row, column=col).value
-            if cell_value:
-                cell_str = str(cell_value).lower().strip()
-                if "product name" in cell_str:
-                    for offset in range(1, 4):
-                        value = ws.cell(row=row, column=col + offset).value
-                        if value:
-                            product_names = [p.strip() for p in str(value).split('\n') if p.strip()]
-                            break
-                elif "article number" in cell_str:
-                    for offset in range(1, 4):
-                        value = ws.cell(row=row, column=col + offset).value
-                        if value:
-                            article_numbers = [str(a).strip() for a in str(value).split('\n') if str(a).strip()]
-                            break
-
-    return product_names, article_numbers
-
-
-def process_file(input_bytes: bytes, input_filename: str, progress_callback=None) -> bytes:
-    """Process a single file through all pipeline steps."""
-    import openpyxl
-    from openpyxl.styles import Alignment, Font, PatternFill
-    from openpyxl.utils import get_column_letter as openpyxl_get_column_letter
-
-    COLUMN_MAPPING = {
-        2: 17, 4: 2, 5: 3, 6: 4, 7: 5, 8: 6,
-        9: 7, 10: 8, 11: 9, 12: 10, 14: 11, 15: 12,
-    }
+def process_file(pool: WorkerPool, file_bytes: bytes, progress_callback=None) -> bytes:
+    """Process a single input file through all pipeline steps on a worker process of ``pool``."""
+    return pool.run(convert_bytes, file_bytes, progress_callback=progress_callback)
 
-    DATA_START_ROW = 11
 
-    # Step 1: Create template
-    if progress_callback:
-        progress_callback(1, "Creating template...")
+def conversion_key(digest: str, version: str) -> str:
+    """Artifact store key of a converted workbook: upload content digest and pipeline version"""
+    return f"conversion:{digest}:{version}"
 
-    template = get_tss_17column_template()
 
-    output_wb = openpyxl.Workbook()
-    output_ws = output_wb.active
-    output_ws.title = "TSS Data"
+@st.cache_resource
+def get_memory_budget() -> MemoryBudget:
+    """RAM budget shared by all sessions of this server process"""
+    return MemoryBudget(default_memory_limit())
 
-    for col_idx, col_config in enumerate(template.columns, 1):
-        cell = output_ws.cell(template.header_row, col_idx, col_config.name)
-        cell.font = Font(bold=col_config.font_bold, color=col_config.font_color)
-        cell.fill = PatternFill(start_color=col_config.bg_color, end_color=col_config.bg_color, fill_type="solid")
-        cell.alignment = Alignment(horizontal=col_config.horizontal_align, vertical=col_config.vertical_align, wrap_text=col_config.wrap_text)
-        col_letter = openpyxl_get_column_letter(col_idx)
-        output_ws.column_dimensions[col_letter].width = col_config.width
-
-    if template.freeze_panes:
-        output_ws.freeze_panes = template.freeze_panes
-
-    # Step 2: Fill product info
-    if progress_callback:
-        progress_callback(2, "Filling product info...")
-
-    input_wb = load_workbook(io.BytesIO(input_bytes))
-    input_sheets = get_sheets_except_material_code(input_wb)
-
-    all_product_names = []
-    all_article_numbers = []
-
-    for input_ws in input_sheets:
-        product_names, article_numbers = find_product_info(input_ws)
-        if product_names:
-            all_product_names.extend(product_names)
-        if article_numbers:
-            all_article_numbers.extend(article_numbers)
-
-    start_col = 18
-    num_products = max(len(all_product_names), len(all_article_numbers))
-
-    header_font = Font(bold=False)
-    header_alignment = Alignment(textRotation=90, vertical='center', horizontal='center', wrap_text=True)
-    article_alignment = Alignment(vertical='center', horizontal='center')
-    peach_fill = PatternFill(start_color="FFFCD5B4", end_color="FFFCD5B4", fill_type="solid")
-
-    for i in range(num_products):
-        col = start_col + i
-        col_letter = output_ws.cell(row=1, column=col).column_letter
-
-        name = all_product_names[i] if i < len(all_product_names) else ""
-        article = all_article_numbers[i] if i < len(all_article_numbers) else ""
-
-        article_cell = output_ws.cell(row=10, column=col, value=article)
-        article_cell.alignment = article_alignment
-        article_cell.font = header_font
-        article_cell.fill = peach_fill
-
-        output_ws.merge_cells(start_row=1, start_column=col, end_row=9, end_column=col)
-        name_cell = output_ws.cell(row=1, column=col, value=name)
-        name_cell.alignment = header_alignment
-        name_cell.font = header_font
-        name_cell.fill = peach_fill
-
-        for row in range(1, 10):
-            cell = output_ws.cell(row=row, column=col)
-            cell.fill = peach_fill
-
-        article_len = len(str(article)) if article else 0
-        width = max(article_len + 2, 10)
-        output_ws.column_dimensions[col_letter].width = width
-
-    # Step 3: Copy data
-    if progress_callback:
-        progress_callback(3, "Copying data...")
-
-    data_start_row = 10
-    output_start_row = 11
-    total_rows = 0
-
-    for input_ws in input_sheets:
-        for input_row in range(data_start_row, input_ws.max_row + 1):
-            has_data = False
-            for input_col in COLUMN_MAPPING.keys():
-                if input_ws.cell(row=input_row, column=input_col).value:
-                    has_data = True
-                    break
-
-            if not has_data:
-                continue
-
-            output_row = output_start_row + total_rows
-
-            for input_col, output_col in COLUMN_MAPPING.items():
-                value = input_ws.cell(row=input_row, column=input_col).value
-                output_ws.cell(row=output_row, column=output_col, value=value)
-
-            total_rows += 1
-
-    center_alignment = Alignment(horizontal='center', vertical='center')
-    for row in range(output_start_row, output_start_row + total_rows):
-        for i in range(num_products):
-            col = start_col + i
-            cell = output_ws.cell(row=row, column=col, value="X")
-            cell.alignment = center_alignment
-
-    input_wb.close()
-
-    # Step 4: Cleanup
-    if progress_callback:
-        progress_callback(4, "Cleaning up data...")
-
-    for row in range(DATA_START_ROW, output_ws.max_row + 1):
-        h_val = output_ws.cell(row=row, column=8).value
-        if h_val:
-            h_lower = str(h_val).lower().strip()
-            if h_lower not in ('test report', 'tr'):
-                output_ws.cell(row=row, column=11).value = None
-
-    for row in range(DATA_START_ROW, output_ws.max_row + 1):
-        q_val = output_ws.cell(row=row, column=17).value
-        if q_val:
-            q_lower = str(q_val).lower()
-            if 'article' in q_lower or 'art' in q_lower:
-                output_ws.cell(row=row, column=1).value = "Art"
-
-    for row in range(DATA_START_ROW, output_ws.max_row + 1):
-        output_ws.cell(row=row, column=17).value = None
-
-    seen = set()
-    rows_to_delete = []
-
-    for row in range(DATA_START_ROW, output_ws.max_row + 1):
-        row_key = tuple(output_ws.cell(row=row, column=col).value for col in range(1, 18))
-        if row_key in seen:
-            rows_to_delete.append(row)
-        else:
-            seen.add(row_key)
 
-    for row in reversed(rows_to_delete):
-        output_ws.delete_rows(row)
+@st.cache_resource
+def get_worker_pool() -> WorkerPool:
+    """Conversion worker processes shared by all sessions, recycled to keep their memory bounded"""
+    return WorkerPool(
+        default_job_workers(),
+        timeout=default_job_timeout(),
+        max_tasks=default_max_tasks(),
+        recycle_rss=default_recycle_rss(),
+        memory_ceiling=default_memory_ceiling(),
+    )
 
-    output_buffer = io.BytesIO()
-    output_wb.save(output_buffer)
-    output_buffer.seek(0)
 
-    # Close workbook to free memory
-    output_wb.close()
+@st.cache_resource
+def get_artifact_store() -> ArtifactStore:
+    """Converted workbooks on disk, shared by all sessions; sessions keep only handles"""
+    return ArtifactStore(default_artifact_dir(), max_bytes=default_artifact_store_bytes(), ttl=CACHE_TTL)
 
-    return output_buffer.getvalue()
 
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """Background conversion jobs shared by all sessions, started round-robin per session"""
+    return JobManager(default_job_workers(), max_queued=default_queue_depth())
 
-def main():
-    # Clear old processed files when new files are uploaded
-    uploaded_files = st.session_state.get('file_uploader', None)
-    current_count = len(uploaded_files) if uploaded_files else 0
-    if 'last_upload_count' in st.session_state:
-        if current_count != st.session_state['last_upload_count']:
-            if 'processed_files' in st.session_state:
-                del st.session_state['processed_files']
-            gc.collect()
-    st.session_state['last_upload_count'] = current_count
 
-    # Header (centered)
-    st.markdown("""
-    <div class="main-header">
-        <div class="main-title">📊 TALIMEX Internal TSS Converter</div>
-        <div class="main-subtitle">Convert TALIMEX Internal TSS to Standard Internal TSS</div>
-    </div>
-    <div class="divider"></div>
-    """, unsafe_allow_html=True)
+def get_session_id() -> str:
+    """Id of this browser session, owner of its background jobs"""
+    if 'session_id' not in st.session_state:
+        st.session_state['session_id'] = uuid.uuid4().hex
+    return st.session_state['session_id']
 
-    # Upload section
-    st.markdown("""
-    <div class="upload-container">
-        <div class="upload-title">📁 Upload Excel File</div>
-        <div class="upload-subtitle">Select .xlsx file to convert</div>
-    </div>
-    """, unsafe_allow_html=True)
 
-    # File uploader
-    uploaded_files = st.file_uploader(
-        "Upload files",
-        type=['xlsx', 'xls'],
-        accept_multiple_files=True,
-        label_visibility="collapsed"
-    )
+def run_conversion(upload: Upload, version: str, budget: MemoryBudget, pool: WorkerPool,
+                   store: ArtifactStore, progress_callback) -> str:
+    """Background job: wait until the estimated peak memory fits the server budget, then convert.
 
-    if not uploaded_files:
-        return
+    Returns the artifact handle of the workbook. The artifact store is the conversion cache:
+    a workbook still stored for this content digest and pipeline version is returned without
+    converting. Errors (including timeouts) are not cached.
+    """
+    key = conversion_key(upload.digest, version)
+    handle = store.lookup(key)
+    if handle is not None:
+        return handle
 
-    st.markdown("---")
+    progress_callback(0, "Waiting for other conversions to finish...")
+    with budget.reservation(estimate_job_memory(upload.data).peak_bytes):
+        return store.put(process_file(pool, upload.data, progress_callback), key=key)
+
+
+def start_conversion(uploads: list[Upload], upload_key: tuple) -> None:
+    """Submit one background job per upload and remember the job ids in the session.
+
+    Raises QueueFull (nothing is submitted) when the server queue has no room for all uploads.
+    """
+    manager = get_job_manager()
+    budget = get_memory_budget()
+    pool = get_worker_pool()
+    store = get_artifact_store()
+    version = pipeline_version()
+    session_id = get_session_id()
+
+    st.session_state['job_ids'] = manager.submit_many(session_id, [
+        (upload.name, run_conversion, (upload, version, budget, pool, store))
+        for upload in uploads
+    ])
+    st.session_state['jobs_key'] = upload_key
+    clear_processed_files()
+
+
+def clear_jobs() -> None:
+    """Release the session's finished jobs and forget their ids"""
+    job_ids = st.session_state.pop('job_ids', None)
+    st.session_state.pop('jobs_key', None)
+    if job_ids:
+        get_job_manager().release(job_ids)
+
+
+def clear_processed_files() -> None:
+    """Forget the session's result handles (the artifacts stay in the store until evicted)"""
+    for key in ('processed_files', 'processed_key', 'processed_zip'):
+        st.session_state.pop(key, None)
+
+
+def zip_artifacts(store: ArtifactStore, processed_files: list[tuple[str, str]]) -> Optional[str]:
+    """Write a ZIP of the converted workbooks into the store; None if one of them was evicted"""
+    zip_path = store.temp_path(".zip")
+    complete = False
+    try:
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for filename, handle in processed_files:
+                artifact = store.open(handle)
+                if artifact is None:
+                    return None
+                with artifact, zf.open(filename, 'w') as entry:
+                    shutil.copyfileobj(artifact, entry)
+        complete = True
+    finally:
+        if not complete:
+            zip_path.unlink(missing_ok=True)
+    return store.put_file(zip_path)
+
+
+def artifact_reader(store: ArtifactStore, handle: str) -> Callable[[], bytes]:
+    """Deferred download data: the artifact is read from disk only when the button is clicked"""
+    def read() -> bytes:
+        artifact = store.open(handle)
+        if artifact is None:
+            raise FileNotFoundError("The converted file has expired. Please convert again.")
+        with artifact:
+            return artifact.read()
+    return read
+
+
+def finish_conversion(jobs: list[Job], upload_key: tuple) -> bool:
+    """Move the result handles of finished jobs into the session; False if no file could be processed"""
+    processed_files = []
+    failed_files = []
+
+    for job in jobs:
+        if job.state == DONE:
+            output_name = f"{Path(job.name).stem}-Converted.xlsx"
+            processed_files.append((output_name, job.result))
+        else:
+            st.error(f"Error processing {job.name}: {job.error}")
+            failed_files.append(job.name)
+
+    clear_jobs()
+
+    if not processed_files:
+        clear_processed_files()
+        st.error("No file could be processed.")
+        return False
+
+    if failed_files:
+        st.warning(f"{len(processed_files)} of {len(jobs)} file(s) processed; "
+                   f"{len(failed_files)} failed: {', '.join(failed_files)}")
+    else:
+        st.success("All files processed successfully!")
+
+    st.session_state['processed_files'] = processed_files
+    st.session_state['processed_key'] = upload_key
+    return True
+
+
+def validate_and_convert(uploads: list[Upload], upload_key: tuple) -> bool:
+    """Validate the uploads and convert them when the Convert button is clicked.
+
+    Returns False when the page should stop rendering (invalid files or no file converted).
+    Each file is converted on its own: a failing file is reported and the others still convert.
+    Validation results and converted workbooks come from the content-addressed caches,
+    so reruns and re-uploads of known files only cost their SHA-256.
+    Conversions run as background jobs; while they run, the page polls them with reruns.
+    """
+    version = pipeline_version()
 
     # Validation
     st.markdown("#### Validation Results")
 
-    # Cache file bytes to avoid reading multiple times
-    file_bytes_cache = {}
-    for uploaded_file in uploaded_files:
-        file_bytes_cache[uploaded_file.name] = uploaded_file.read()
-
-    validation_results = []
-    for uploaded_file in uploaded_files:
-        file_bytes = file_bytes_cache[uploaded_file.name]
-        result = validate_file_content(file_bytes, uploaded_file.name)
-        validation_results.append((uploaded_file, result))
+    validation_results = [
+        (upload, validate_file_content(upload.digest, version, upload.name, upload.data))
+        for upload in uploads
+    ]
 
     valid_files = []
     invalid_files = []
 
-    for uploaded_file, result in validation_results:
+    for upload, result in validation_results:
         if result.is_valid:
-            valid_files.append(uploaded_file)
-            st.markdown(f'<span class="file-valid">✓ {uploaded_file.name}</span> - Valid', unsafe_allow_html=True)
+            valid_files.append(upload)
+            st.markdown(f'<span class="file-valid">✓ {upload.name}</span> - Valid', unsafe_allow_html=True)
         else:
-            invalid_files.append((uploaded_file, result))
-            st.markdown(f'<span class="file-invalid">✗ {uploaded_file.name}</span> - Invalid', unsafe_allow_html=True)
+            invalid_files.append((upload, result))
+            st.markdown(f'<span class="file-invalid">✗ {upload.name}</span> - Invalid', unsafe_allow_html=True)
             for error in result.errors:
                 st.caption(f"   Column {error.column_letter}: expected '{error.expected}', got '{error.actual}'")
 
     if invalid_files:
         st.error(f"{len(invalid_files)} file(s) have invalid format. Please fix and re-upload.")
-        return
+        return False
 
     st.success(f"All {len(valid_files)} file(s) are valid and ready to process.")
 
     st.markdown("---")
 
+    # Jobs of this upload set keep running in the background across reruns
+    job_ids = st.session_state.get('job_ids') if st.session_state.get('jobs_key') == upload_key else None
+    jobs = get_job_manager().jobs(job_ids) if job_ids else []
+    running = any(not job.finished for job in jobs)
+
     # Convert button
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2:
-        convert_clicked = st.button("🚀 Convert Files", type="primary", use_container_width=True)
+        convert_clicked = st.button("🚀 Convert Files", type="primary", use_container_width=True, disabled=running)
 
     if convert_clicked:
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+        try:
+            start_conversion(valid_files, upload_key)
+        except QueueFull as e:
+            st.warning(f"⏳ {e}")
+            return False
+        job_ids = st.session_state['job_ids']
+        jobs = get_job_manager().jobs(job_ids)
+        running = True
 
-        processed_files = []
+    if not job_ids:
+        return True
 
-        for uploaded_file in valid_files:
-            status_text.text(f"Processing: {uploaded_file.name}")
-            file_bytes = file_bytes_cache[uploaded_file.name]
+    if len(jobs) < len(job_ids):
+        # Released or expired on the server (e.g. after a restart)
+        clear_jobs()
+        st.warning("Conversion results are no longer available. Please convert again.")
+        return False
 
-            def update_progress(step, status):
-                progress_bar.progress(step / 4)
-                status_text.text(f"Step {step}/4: {status}")
+    if running:
+        for job in jobs:
+            st.progress(job.progress, text=f"{job.name}: {job.status}")
+        time.sleep(JOB_POLL_INTERVAL)
+        st.rerun()
 
-            try:
-                result_bytes = process_file(file_bytes, uploaded_file.name, update_progress)
-                input_name = Path(uploaded_file.name).stem
-                output_name = f"{input_name}-Converted.xlsx"
-                processed_files.append((output_name, result_bytes))
+    return finish_conversion(jobs, upload_key)
 
-            except Exception as e:
-                st.error(f"Error processing {uploaded_file.name}: {str(e)}")
-                return
 
-        progress_bar.progress(1.0)
-        status_text.empty()
-        st.success("All files processed successfully!")
+def main():
+    # Header (centered)
+    st.markdown("""
+    <div class="main-header">
+        <div class="main-title">📊 TALIMEX Internal TSS Converter</div>
+        <div class="main-subtitle">Convert TALIMEX Internal TSS to Standard Internal TSS</div>
+    </div>
+    <div class="divider"></div>
+    """, unsafe_allow_html=True)
+
+    # Upload section
+    st.markdown("""
+    <div class="upload-container">
+        <div class="upload-title">📁 Upload Excel File</div>
+        <div class="upload-subtitle">Select .xlsx file to convert</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # File uploader
+    uploaded_files = st.file_uploader(
+        "Upload files",
+        type=['xlsx', 'xls'],
+        accept_multiple_files=True,
+        label_visibility="collapsed"
+    )
+
+    # Results belong to the exact set of uploaded contents; drop them when it changes
+    uploads = read_uploads(uploaded_files or [])
+    upload_key = tuple((upload.name, upload.digest) for upload in uploads)
+    if st.session_state.get('processed_key') != upload_key and 'processed_files' in st.session_state:
+        clear_processed_files()
+    if st.session_state.get('jobs_key', upload_key) != upload_key:
+        clear_jobs()
+
+    if not uploads:
+        return
 
-        st.session_state['processed_files'] = processed_files
+    st.markdown("---")
 
-        # Clear cache and collect garbage after processing
-        file_bytes_cache.clear()
-        gc.collect()
+    if not validate_and_convert(uploads, upload_key):
+        return
 
     # Download section
     if 'processed_files' in st.session_state and st.session_state['processed_files']:
         st.markdown("---")
         st.markdown("#### Download Results")
 
+        store = get_artifact_store()
         processed_files = st.session_state['processed_files']
 
         if len(processed_files) == 1:
-            filename, file_bytes = processed_files[0]
-            st.download_button(
-                label=f"📥 Download {filename}",
-                data=file_bytes,
-                file_name=filename,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True
-            )
+            filename, handle = processed_files[0]
+            label = f"📥 Download {filename}"
+            mime = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         else:
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
-                for filename, file_bytes in processed_files:
-                    zf.writestr(filename, file_bytes)
-            zip_buffer.seek(0)
-
-            st.download_button(
-                label=f"📥 Download All ({len(processed_files)} files as ZIP)",
-                data=zip_buffer.getvalue(),
-                file_name="TSS_Converted_Files.zip",
-                mime="application/zip",
-                use_container_width=True
-            )
+            # The ZIP is built once on disk, not on every rerun
+            handle = st.session_state.get('processed_zip')
+            if handle is None or handle not in store:
+                handle = zip_artifacts(store, processed_files)
+                st.session_state['processed_zip'] = handle
+            filename = "TSS_Converted_Files.zip"
+            label = f"📥 Download All ({len(processed_files)} files as ZIP)"
+            mime = "application/zip"
+
+        if handle is None or handle not in store:
+            clear_processed_files()
+            st.warning("The converted files have expired. Please convert again.")
+            return
+
+        st.download_button(
+            label=label,
+            data=artifact_reader(store, handle),
+            file_name=filename,
+            mime=mime,
+            use_container_width=True
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,250 @@
+"""
+Artifact Store - Converted workbooks on local disk, shared by all app sessions
+Artifacts are stored once per content (file name = SHA-256 of the bytes),
+so sessions keep only the handle. The store has a total size cap: the
+least recently used artifacts are evicted past it, and artifacts not used
+for the TTL are removed. Eviction only removes files; a session holding
+an evicted handle gets None from open() and has to convert again.
+
+An artifact can also be stored under a key (e.g. the input digest and
+pipeline version of a conversion); lookup(key) then finds it again, also
+after a restart. The store is the app's conversion cache.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+MB = 1024 * 1024
+
+DEFAULT_MAX_BYTES = 1024 * MB
+DEFAULT_TTL = 60 * 60           # Seconds an artifact is kept after its last use
+HASH_CHUNK_SIZE = 1024 * 1024
+ARTIFACT_DIR_ENV = "TSS_ARTIFACT_DIR"
+ARTIFACT_STORE_MB_ENV = "TSS_ARTIFACT_STORE_MB"
+
+_HANDLE_RE = re.compile(r"[0-9a-f]{64}")
+_TEMP_DIR = "tmp"
+_KEYS_DIR = "keys"             # One file per key, named by the key's SHA-256, holding the handle
+
+
+def _key_id(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def default_artifact_dir() -> Path:
+    """Store directory: $TSS_ARTIFACT_DIR, else tss-artifacts in the system temp directory"""
+    env_value = os.environ.get(ARTIFACT_DIR_ENV)
+    if env_value:
+        return Path(env_value)
+    return Path(tempfile.gettempdir()) / "tss-artifacts"
+
+
+def default_artifact_store_bytes() -> int:
+    """Store size cap: $TSS_ARTIFACT_STORE_MB, else DEFAULT_MAX_BYTES"""
+    env_value = os.environ.get(ARTIFACT_STORE_MB_ENV)
+    if env_value:
+        return int(float(env_value) * MB)
+    return DEFAULT_MAX_BYTES
+
+
+class ArtifactStore:
+    """
+    Content-addressed artifact directory with a size cap, LRU eviction and TTL
+
+    Artifacts and keys already in the directory (e.g. from before a
+    restart) are indexed on start, ordered by their last use (file mtime).
+
+    Example:
+        store = ArtifactStore("/var/tmp/tss-artifacts", max_bytes=512 * MB)
+        handle = store.lookup(key) or store.put(workbook_bytes, key=key)
+        with store.open(handle) as f:     # None once evicted
+            ...
+    """
+
+    def __init__(self,
+                 root: Union[str, Path],
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl: Optional[float] = DEFAULT_TTL):
+        """
+        Initialize ArtifactStore
+
+        Args:
+            root: Store directory (created if missing)
+            max_bytes: Total size of the stored artifacts
+            ttl: Seconds an unused artifact is kept (None = until evicted by size)
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()  # handle -> (size, last use), oldest first
+        self._total = 0
+        self._keys: dict[str, str] = {}                 # key id -> handle
+        self._key_ids: dict[str, set[str]] = {}         # handle -> key ids
+
+        self._temp_dir.mkdir(parents=True, exist_ok=True)
+        self._keys_dir.mkdir(exist_ok=True)
+        for leftover in self._temp_dir.iterdir():
+            leftover.unlink(missing_ok=True)
+        entries = []
+        for path in self.root.iterdir():
+            if path.is_file() and _HANDLE_RE.fullmatch(path.name):
+                stat = path.stat()
+                entries.append((stat.st_mtime, path.name, stat.st_size))
+        for last_used, handle, size in sorted(entries):
+            self._entries[handle] = (size, last_used)
+            self._total += size
+        for path in self._keys_dir.iterdir():
+            handle = path.read_text().strip() if _HANDLE_RE.fullmatch(path.name) else ""
+            if handle in self._entries:
+                self._link(path.name, handle)
+            else:
+                path.unlink(missing_ok=True)
+        with self._lock:
+            self._evict()
+
+    @property
+    def _temp_dir(self) -> Path:
+        return self.root / _TEMP_DIR
+
+    @property
+    def _keys_dir(self) -> Path:
+        return self.root / _KEYS_DIR
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, handle: str) -> bool:
+        with self._lock:
+            return handle in self._entries and self._path(handle).exists()
+
+    def _path(self, handle: str) -> Path:
+        if not _HANDLE_RE.fullmatch(handle):
+            raise ValueError(f"Invalid artifact handle: {handle!r}")
+        return self.root / handle
+
+    def temp_path(self, suffix: str = "") -> Path:
+        """Path for a file that is being written and will be added with put_file()"""
+        fd, name = tempfile.mkstemp(suffix=suffix, dir=self._temp_dir)
+        os.close(fd)
+        return Path(name)
+
+    def put(self, data: bytes, key: Optional[str] = None) -> str:
+        """Store bytes (under ``key`` if given); returns the handle (SHA-256 hex)"""
+        path = self.temp_path()
+        path.write_bytes(data)
+        return self._add(path, hashlib.sha256(data).hexdigest(), key)
+
+    def put_file(self, path: Union[str, Path], key: Optional[str] = None) -> str:
+        """Move a file from temp_path() into the store (under ``key`` if given); returns the handle"""
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                h.update(chunk)
+        return self._add(Path(path), h.hexdigest(), key)
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Handle of the artifact stored under ``key`` (marks it used); None if unknown or evicted"""
+        key_id = _key_id(key)
+        with self._lock:
+            handle = self._keys.get(key_id)
+            if handle is None:
+                return None
+            if not self._path(handle).exists():
+                self._drop(handle)
+                return None
+            self._touch(handle)
+            return handle
+
+    def _link(self, key_id: str, handle: str) -> None:
+        """Index a key of an artifact (lock held or during __init__)"""
+        old_handle = self._keys.get(key_id)
+        if old_handle is not None and old_handle != handle:
+            self._key_ids[old_handle].discard(key_id)
+        self._keys[key_id] = handle
+        self._key_ids.setdefault(handle, set()).add(key_id)
+
+    def _add(self, path: Path, handle: str, key: Optional[str] = None) -> str:
+        size = path.stat().st_size
+        target = self._path(handle)
+        with self._lock:
+            if handle in self._entries and target.exists():
+                path.unlink(missing_ok=True)
+                self._touch(handle)
+            else:
+                os.replace(path, target)
+                if handle in self._entries:
+                    self._total -= self._entries.pop(handle)[0]
+                self._entries[handle] = (size, time.time())
+                self._total += size
+            if key is not None:
+                key_id = _key_id(key)
+                key_path = self._keys_dir / key_id
+                key_temp = key_path.with_suffix(".tmp")
+                key_temp.write_text(handle)
+                os.replace(key_temp, key_path)
+                self._link(key_id, handle)
+            self._evict(keep=handle)
+        return handle
+
+    def open(self, handle: str) -> Optional[BinaryIO]:
+        """Open an artifact for reading (marks it used); None if it was evicted"""
+        with self._lock:
+            if handle not in self._entries:
+                return None
+            try:
+                f = open(self._path(handle), "rb")
+            except FileNotFoundError:
+                self._drop(handle)
+                return None
+            self._touch(handle)
+            self._evict(keep=handle)
+            return f
+
+    def _touch(self, handle: str) -> None:
+        """Mark as most recently used (lock held); the mtime keeps the order across restarts"""
+        size, _ = self._entries.pop(handle)
+        now = time.time()
+        self._entries[handle] = (size, now)
+        try:
+            os.utime(self._path(handle), (now, now))
+        except OSError:
+            pass
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Remove expired artifacts, then least recently used ones past max_bytes (lock held)"""
+        expired = None if self.ttl is None else time.time() - self.ttl
+        for handle, (size, last_used) in list(self._entries.items()):
+            if handle == keep:
+                continue
+            if (expired is None or last_used >= expired) and self._total <= self.max_bytes:
+                break
+            self._drop(handle)
+            self._path(handle).unlink(missing_ok=True)
+
+    def _drop(self, handle: str) -> None:
+        """Forget an artifact and its keys (lock held)"""
+        size, _ = self._entries.pop(handle)
+        self._total -= size
+        for key_id in self._key_ids.pop(handle, ()):
+            if self._keys.get(key_id) == handle:
+                del self._keys[key_id]
+                (self._keys_dir / key_id).unlink(missing_ok=True)
+
+    def evict(self) -> None:
+        """Apply the TTL and size cap now (they are also applied on every put and open)"""
+        with self._lock:
+            self._evict()
@@ -0,0 +1,143 @@
+"""
+Batch Journal - Per-file status of the last CLI batch run
+An append-only JSON Lines file in the output folder. Every record is
+flushed and fsynced when written, so after a crash or Ctrl+C the journal
+still tells which files of the run completed and which must be redone.
+"""
+
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+JOURNAL_NAME = ".tss-journal.jsonl"
+
+# File statuses
+STATUS_DONE = "done"              # Output written
+STATUS_UNCHANGED = "unchanged"    # Output of a previous run is still up to date
+STATUS_INVALID = "invalid"        # Header validation failed
+STATUS_SKIPPED = "skipped"        # Nothing to convert (no usable sheet)
+STATUS_FAILED = "failed"          # Error while processing, redone on resume
+
+COMPLETED_STATUSES = frozenset({STATUS_DONE, STATUS_UNCHANGED, STATUS_INVALID, STATUS_SKIPPED})
+
+
+@dataclass
+class JournalRun:
+    """State of one batch run as recorded in the journal"""
+    run_id: str
+    files: list[str]
+    force: bool = False
+    statuses: dict[str, str] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+    finished: bool = False
+
+    @property
+    def incomplete_files(self) -> list[str]:
+        """Files of the run without a completed status, in run order"""
+        return [name for name in self.files if self.statuses.get(name) not in COMPLETED_STATUSES]
+
+
+class BatchJournal:
+    """
+    Writer for the journal of the current run
+
+    Example:
+        journal = BatchJournal.start(output_folder, [f.name for f in files])
+        journal.record("a.xlsx", STATUS_DONE)
+        journal.finish()
+    """
+
+    def __init__(self, path: Path, run: JournalRun):
+        self.path = path
+        self.run = run
+        self._file = None
+
+    @classmethod
+    def start(cls, output_folder, files: list[str], force: bool = False) -> "BatchJournal":
+        """Start a new run; the journal of the previous run is replaced"""
+        journal = cls(Path(output_folder) / JOURNAL_NAME, JournalRun(uuid.uuid4().hex, list(files), force))
+        journal._file = open(journal.path, "w", encoding="utf-8")
+        journal._write({"event": "run", "run_id": journal.run.run_id, "files": journal.run.files, "force": force})
+        return journal
+
+    @classmethod
+    def resume(cls, run: JournalRun, output_folder) -> "BatchJournal":
+        """Continue ``run`` (as returned by load_last_run), appending to its journal"""
+        journal = cls(Path(output_folder) / JOURNAL_NAME, run)
+        run.finished = False
+        journal._file = open(journal.path, "a", encoding="utf-8")
+        journal._write({"event": "resume", "run_id": run.run_id})
+        return journal
+
+    def _write(self, record: dict) -> None:
+        record["time"] = time.time()
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record(self, file_name: str, status: str, error: Optional[str] = None, sha256: Optional[str] = None) -> None:
+        """Record the outcome of one file"""
+        self.run.statuses[file_name] = status
+        if error:
+            self.run.errors[file_name] = error
+        else:
+            self.run.errors.pop(file_name, None)
+        self._write({
+            "event": "file",
+            "run_id": self.run.run_id,
+            "file": file_name,
+            "status": status,
+            "error": error,
+            "sha256": sha256,
+        })
+
+    def finish(self) -> None:
+        """Mark the run as finished (every file was attempted)"""
+        self.run.finished = True
+        self._write({"event": "end", "run_id": self.run.run_id})
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_last_run(output_folder) -> Optional[JournalRun]:
+    """Read the last run from the journal; None if there is no readable journal"""
+    path = Path(output_folder) / JOURNAL_NAME
+    run = None
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Truncated last line after a crash
+                event = record.get("event")
+                if event == "run":
+                    run = JournalRun(record["run_id"], record.get("files", []), record.get("force", False))
+                elif run is None or record.get("run_id") != run.run_id:
+                    continue
+                elif event == "file":
+                    run.statuses[record["file"]] = record["status"]
+                    if record.get("error"):
+                        run.errors[record["file"]] = record["error"]
+                    else:
+                        run.errors.pop(record["file"], None)
+                elif event == "resume":
+                    run.finished = False
+                elif event == "end":
+                    run.finished = True
+    except OSError:
+        return None
+    return run
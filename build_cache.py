@@ -0,0 +1,147 @@
+"""
+Build Cache - Incremental CLI batch builds
+A manifest in the output folder records, per input file, the SHA-256 of
+the input bytes, the pipeline version and the output file it produced.
+An input is up to date when its hash and the pipeline version match the
+manifest and the recorded output is still on disk unchanged.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from cleanup_rules import TSS_CLEANUP_RULES
+from step0_validate import EXPECTED_HEADERS, HEADER_ROW
+from step3_copy_data import get_column_mapping
+from streamlit_ui_toolkit.templates import get_tss_17column_template, mapping_fingerprint, template_fingerprint
+from streamlit_ui_toolkit.version import __version__
+
+MANIFEST_NAME = ".tss-manifest.json"
+MANIFEST_FORMAT = 1
+PIPELINE_REVISION = 1   # Bump when conversion logic changes without a mapping/template change
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path) -> str:
+    """SHA-256 of a file, read in chunks"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def pipeline_version() -> str:
+    """
+    Version of everything that shapes an output file
+
+    Toolkit version, pipeline revision, column mapping, cleanup rule table,
+    expected headers and the TSS template fingerprint; any change
+    invalidates the cache.
+    """
+    payload = json.dumps({
+        "toolkit": __version__,
+        "revision": PIPELINE_REVISION,
+        "column_mapping": mapping_fingerprint(get_column_mapping()),
+        "cleanup_rules": [
+            (rule.name, rule.column, rule.predicate.__name__, rule.target, rule.value) for rule in TSS_CLEANUP_RULES
+        ],
+        "header_row": HEADER_ROW,
+        "expected_headers": sorted(EXPECTED_HEADERS.items()),
+        "template": template_fingerprint(get_tss_17column_template()),
+    }, sort_keys=True)
+    return f"{__version__}+{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]}"
+
+
+@dataclass
+class ManifestEntry:
+    """Manifest record of one input file"""
+    input_sha256: str
+    pipeline_version: str
+    output_file: str        # Output file name, relative to the output folder
+    output_sha256: str
+    output_size: int
+    output_mtime_ns: int
+
+
+class BuildManifest:
+    """
+    Input -> output records of previous builds
+
+    Example:
+        manifest = BuildManifest.load(output_folder)
+        digest = file_sha256(input_file)
+        if not manifest.is_up_to_date(input_file.name, digest):
+            ...convert...
+            manifest.record(input_file.name, digest, output_file)
+        manifest.save()
+    """
+
+    def __init__(self, output_folder, entries: Optional[dict] = None):
+        self.output_folder = Path(output_folder)
+        self.path = self.output_folder / MANIFEST_NAME
+        self.entries: dict[str, ManifestEntry] = entries or {}
+
+    @classmethod
+    def load(cls, output_folder) -> "BuildManifest":
+        """Load the manifest of ``output_folder``; a missing or unreadable manifest is empty"""
+        manifest = cls(output_folder)
+        try:
+            data = json.loads(manifest.path.read_text(encoding="utf-8"))
+            if data.get("format") == MANIFEST_FORMAT:
+                manifest.entries = {
+                    name: ManifestEntry(**entry) for name, entry in data.get("files", {}).items()
+                }
+        except (OSError, ValueError, TypeError):
+            pass
+        return manifest
+
+    def is_up_to_date(self, input_name: str, input_sha256: str) -> bool:
+        """
+        True if ``input_name`` with this content was built by this pipeline version
+        and its output is unchanged (checked by size and mtime, not re-hashed)
+        """
+        entry = self.entries.get(input_name)
+        if entry is None:
+            return False
+        if entry.input_sha256 != input_sha256 or entry.pipeline_version != pipeline_version():
+            return False
+        try:
+            stat = (self.output_folder / entry.output_file).stat()
+        except OSError:
+            return False
+        return stat.st_size == entry.output_size and stat.st_mtime_ns == entry.output_mtime_ns
+
+    def record(self, input_name: str, input_sha256: str, output_file) -> None:
+        """Record a fresh output of ``input_name``"""
+        output_file = Path(output_file)
+        stat = output_file.stat()
+        self.entries[input_name] = ManifestEntry(
+            input_sha256=input_sha256,
+            pipeline_version=pipeline_version(),
+            output_file=output_file.name,
+            output_sha256=file_sha256(output_file),
+            output_size=stat.st_size,
+            output_mtime_ns=stat.st_mtime_ns,
+        )
+
+    def discard(self, input_name: str) -> None:
+        """Forget ``input_name`` (e.g. its build failed)"""
+        self.entries.pop(input_name, None)
+
+    def save(self) -> None:
+        """Write the manifest atomically"""
+        data = {
+            "format": MANIFEST_FORMAT,
+            "pipeline_version": pipeline_version(),
+            "files": {name: asdict(entry) for name, entry in sorted(self.entries.items())},
+        }
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,277 @@
+"""
+Checkpoint - Compact binary intermediate format for converter row data
+A .tssc file holds the product names, article numbers and output row
+records (columns A-Q) of one conversion stage. It is a sequence of
+CRC-checked frames with tagged values, so stages write and read it with
+plain struct packing instead of building and parsing an xlsx workbook.
+
+Layout:
+    magic b"TSSC", format version (u8)
+    frames: tag (1 byte) | payload length (u32) | crc32 of tag + payload (u32) | payload
+        b"M" metadata (JSON: stage, source, columns)
+        b"P" product names      (value list)
+        b"A" article numbers    (value list)
+        b"R" row block          (row count u32, then columns x values per row)
+        b"E" end                (total row count u64)
+"""
+
+import datetime
+import io
+import json
+import struct
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional, Union
+
+MAGIC = b"TSSC"
+FORMAT_VERSION = 2
+CHECKPOINT_SUFFIX = ".tssc"
+ROWS_PER_FRAME = 4096
+
+FRAME_META = b"M"
+FRAME_PRODUCTS = b"P"
+FRAME_ARTICLES = b"A"
+FRAME_ROWS = b"R"
+FRAME_END = b"E"
+
+_FRAME_HEADER = struct.Struct("<cII")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+
+# Value tags
+_NONE, _STR, _INT, _FLOAT, _TRUE, _FALSE, _BIGINT, _DATETIME, _DATE, _TIME, _TIMEDELTA = range(11)
+
+_I64_MIN, _I64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+class CheckpointError(Exception):
+    """Raised for files that are not valid .tssc checkpoints"""
+
+
+@dataclass
+class Checkpoint:
+    """Row data of one conversion stage"""
+    product_names: list = field(default_factory=list)
+    article_numbers: list = field(default_factory=list)
+    rows: list[list] = field(default_factory=list)
+    stage: str = ""
+    source: Optional[str] = None
+    columns: int = 17
+
+
+def _encode_str(out: bytearray, tag: int, text: str) -> None:
+    data = text.encode("utf-8", "surrogatepass")
+    out.append(tag)
+    out += _U32.pack(len(data))
+    out += data
+
+
+def _encode_value(out: bytearray, value) -> None:
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, str):
+        _encode_str(out, _STR, value)
+    elif isinstance(value, int):
+        if _I64_MIN <= value <= _I64_MAX:
+            out.append(_INT)
+            out += _I64.pack(value)
+        else:
+            _encode_str(out, _BIGINT, str(value))
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _F64.pack(value)
+    elif isinstance(value, datetime.datetime):
+        _encode_str(out, _DATETIME, value.isoformat())
+    elif isinstance(value, datetime.date):
+        _encode_str(out, _DATE, value.isoformat())
+    elif isinstance(value, datetime.time):
+        _encode_str(out, _TIME, value.isoformat())
+    elif isinstance(value, datetime.timedelta):
+        out.append(_TIMEDELTA)
+        out += _F64.pack(value.total_seconds())
+    else:
+        # Same fallback as writing an unknown type to a cell: its text
+        _encode_str(out, _STR, str(value))
+
+
+def _decode_values(payload: memoryview, pos: int, count: int) -> tuple[list, int]:
+    values = []
+    append = values.append
+    for _ in range(count):
+        tag = payload[pos]
+        pos += 1
+        if tag == _NONE:
+            append(None)
+        elif tag == _STR:
+            (size,) = _U32.unpack_from(payload, pos)
+            pos += 4
+            append(str(payload[pos:pos + size], "utf-8", "surrogatepass"))
+            pos += size
+        elif tag == _INT:
+            append(_I64.unpack_from(payload, pos)[0])
+            pos += 8
+        elif tag == _FLOAT:
+            append(_F64.unpack_from(payload, pos)[0])
+            pos += 8
+        elif tag == _TRUE:
+            append(True)
+        elif tag == _FALSE:
+            append(False)
+        elif tag == _TIMEDELTA:
+            append(datetime.timedelta(seconds=_F64.unpack_from(payload, pos)[0]))
+            pos += 8
+        elif tag in (_BIGINT, _DATETIME, _DATE, _TIME):
+            (size,) = _U32.unpack_from(payload, pos)
+            pos += 4
+            text = str(payload[pos:pos + size], "utf-8")
+            pos += size
+            if tag == _BIGINT:
+                append(int(text))
+            elif tag == _DATETIME:
+                append(datetime.datetime.fromisoformat(text))
+            elif tag == _DATE:
+                append(datetime.date.fromisoformat(text))
+            else:
+                append(datetime.time.fromisoformat(text))
+        else:
+            raise CheckpointError(f"Unknown value tag {tag}")
+    return values, pos
+
+
+def _frame_crc(tag: bytes, payload) -> int:
+    """The tag is covered too, so a damaged tag is not read as an unknown (skipped) frame"""
+    return zlib.crc32(payload, zlib.crc32(tag))
+
+
+def _write_frame(f: BinaryIO, tag: bytes, payload) -> None:
+    f.write(_FRAME_HEADER.pack(tag, len(payload), _frame_crc(tag, payload)))
+    f.write(payload)
+
+
+def _value_list(values: Iterable) -> bytearray:
+    values = list(values)
+    out = bytearray(_U32.pack(len(values)))
+    for value in values:
+        _encode_value(out, value)
+    return out
+
+
+def write_checkpoint(target: Union[str, Path, BinaryIO],
+                     product_names: list,
+                     article_numbers: list,
+                     rows: Iterable[list],
+                     stage: str = "",
+                     source: Optional[str] = None,
+                     columns: int = 17) -> int:
+    """
+    Write a checkpoint file
+
+    Args:
+        target: Path or binary file object
+        product_names: Product names (columns R onwards)
+        article_numbers: Article numbers (columns R onwards)
+        rows: Row records with ``columns`` values each
+        stage: Pipeline stage label, e.g. "Step3"
+        source: Name of the input file
+        columns: Values per row record
+
+    Returns:
+        Number of rows written
+    """
+    if isinstance(target, (str, Path)):
+        with open(target, "wb") as f:
+            return write_checkpoint(f, product_names, article_numbers, rows, stage, source, columns)
+
+    f = target
+    f.write(MAGIC + bytes([FORMAT_VERSION]))
+    meta = {"stage": stage, "source": source, "columns": columns}
+    _write_frame(f, FRAME_META, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+    _write_frame(f, FRAME_PRODUCTS, _value_list(product_names))
+    _write_frame(f, FRAME_ARTICLES, _value_list(article_numbers))
+
+    total = 0
+    block = bytearray()
+    block_rows = 0
+    for record in rows:
+        if len(record) != columns:
+            raise ValueError(f"Row {total + 1} has {len(record)} values, expected {columns}")
+        for value in record:
+            _encode_value(block, value)
+        block_rows += 1
+        total += 1
+        if block_rows == ROWS_PER_FRAME:
+            _write_frame(f, FRAME_ROWS, _U32.pack(block_rows) + block)
+            block = bytearray()
+            block_rows = 0
+    if block_rows:
+        _write_frame(f, FRAME_ROWS, _U32.pack(block_rows) + block)
+
+    _write_frame(f, FRAME_END, _U64.pack(total))
+    return total
+
+
+def read_checkpoint(source: Union[str, Path, bytes, BinaryIO]) -> Checkpoint:
+    """Read a checkpoint file (path, bytes or binary file object)"""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            return read_checkpoint(f)
+
+    f = source
+    head = f.read(len(MAGIC) + 1)
+    if len(head) <= len(MAGIC) or head[:len(MAGIC)] != MAGIC:
+        raise CheckpointError("Not a TSS checkpoint file")
+    if head[len(MAGIC)] != FORMAT_VERSION:
+        raise CheckpointError(f"Unsupported checkpoint version {head[len(MAGIC)]}")
+
+    checkpoint = Checkpoint()
+    while True:
+        header = f.read(_FRAME_HEADER.size)
+        if len(header) < _FRAME_HEADER.size:
+            raise CheckpointError("Truncated checkpoint (no end frame)")
+        tag, size, crc = _FRAME_HEADER.unpack(header)
+        payload = f.read(size)
+        if len(payload) != size or _frame_crc(tag, payload) != crc:
+            raise CheckpointError(f"Corrupt checkpoint frame {tag!r}")
+        try:
+            if _read_frame(checkpoint, tag, payload):
+                return checkpoint
+        except (IndexError, ValueError, struct.error) as e:
+            raise CheckpointError(f"Invalid checkpoint frame {tag!r}: {e}") from e
+
+
+def _read_frame(checkpoint: Checkpoint, tag: bytes, payload: bytes) -> bool:
+    """Apply one frame to the checkpoint; True at the end frame"""
+    view = memoryview(payload)
+    if tag == FRAME_META:
+        meta = json.loads(payload.decode("utf-8"))
+        checkpoint.stage = meta.get("stage", "")
+        checkpoint.source = meta.get("source")
+        checkpoint.columns = meta.get("columns", checkpoint.columns)
+    elif tag in (FRAME_PRODUCTS, FRAME_ARTICLES):
+        (count,) = _U32.unpack_from(view, 0)
+        values, _ = _decode_values(view, 4, count)
+        if tag == FRAME_PRODUCTS:
+            checkpoint.product_names = values
+        else:
+            checkpoint.article_numbers = values
+    elif tag == FRAME_ROWS:
+        (count,) = _U32.unpack_from(view, 0)
+        values, _ = _decode_values(view, 4, count * checkpoint.columns)
+        columns = checkpoint.columns
+        checkpoint.rows.extend(values[i:i + columns] for i in range(0, len(values), columns))
+    elif tag == FRAME_END:
+        (total,) = _U64.unpack_from(view, 0)
+        if total != len(checkpoint.rows):
+            raise CheckpointError(f"Row count mismatch: {len(checkpoint.rows)} of {total}")
+        return True
+    # Unknown frames are skipped (forward compatible)
+    return False
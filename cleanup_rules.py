@@ -0,0 +1,112 @@
+"""
+Cleanup Rules - Declarative Step 4 cleanup rules
+Each rule reads one condition column and, when the value is non-empty and
+matches the predicate, sets a target column. The rule table is compiled
+into a single per-row function, so every rule is applied in one pass over
+the rows instead of one full scan per rule.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable
+
+COL_A = 1               # Combination ("Art")
+COL_H = 8               # Document type
+COL_K = 11              # Regulation or substances
+COL_Q = 17              # Temporary: input MATERIAL column
+
+
+@dataclass(frozen=True)
+class CleanupRule:
+    """If ``row[column]`` is non-empty and ``predicate(value)``: ``row[target] = value``"""
+    name: str                           # Hit counter name
+    column: int                         # Condition column (1-based)
+    predicate: Callable[[Any], bool]
+    target: int                         # Column to set (1-based)
+    value: Any = None                   # None clears the target
+
+
+def is_not_test_report(value) -> bool:
+    return str(value).lower().strip() not in ('test report', 'tr')
+
+
+def mentions_article(value) -> bool:
+    q_lower = str(value).lower()
+    return 'article' in q_lower or 'art' in q_lower
+
+
+def always(value) -> bool:
+    return True
+
+
+# Applied in this order within each row
+TSS_CLEANUP_RULES = (
+    CleanupRule("k_cleared", COL_H, is_not_test_report, COL_K),         # Clear K if H is not Test report/TR
+    CleanupRule("art_filled", COL_Q, mentions_article, COL_A, "Art"),   # 'Art' in A if Q mentions Article
+    CleanupRule("q_cleared", COL_Q, always, COL_Q),                     # Clear Q
+)
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """
+    A rule table compiled into one per-row function
+
+    ``apply(row, counts)`` applies every rule to the row (a list, column A
+    at index 0) and increments ``counts[i]`` for each hit of rule ``i``.
+
+    Example:
+        rules = compile_rules(TSS_CLEANUP_RULES)
+        counts = rules.new_counts()
+        for row in rows:
+            rules.apply(row, counts)
+        print(rules.hits(counts))
+    """
+    rules: tuple[CleanupRule, ...]
+    apply: Callable[[list, list], None]
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return tuple(rule.name for rule in self.rules)
+
+    @property
+    def width(self) -> int:
+        """Number of columns a row must have"""
+        return max((max(rule.column, rule.target) for rule in self.rules), default=0)
+
+    def new_counts(self) -> list[int]:
+        return [0] * len(self.rules)
+
+    def hits(self, counts: list[int]) -> dict[str, int]:
+        return dict(zip(self.names, counts))
+
+
+def compile_rules(rules) -> CompiledRules:
+    """
+    Build the fused per-row function of a rule table
+
+    A rule sees the row as left by the rules before it, which gives the
+    same result as running each rule as a separate full scan (rules never
+    look at other rows).
+    """
+    rules = tuple(rules)
+    # 0-based (counter, column, predicate, target, value) per rule
+    steps = tuple(
+        (i, rule.column - 1, rule.predicate, rule.target - 1, rule.value)
+        for i, rule in enumerate(rules)
+    )
+
+    def apply(row, counts):
+        for i, column, predicate, target, value in steps:
+            current = row[column]
+            if current and predicate(current):
+                row[target] = value
+                counts[i] += 1
+
+    return CompiledRules(rules=rules, apply=apply)
+
+
+@lru_cache(maxsize=None)
+def get_tss_cleanup_rules() -> CompiledRules:
+    """Compiled TSS_CLEANUP_RULES (compiled once per process)"""
+    return compile_rules(TSS_CLEANUP_RULES)
@@ -0,0 +1,241 @@
+"""
+Converter - TALIMEX Internal TSS -> Standard TSS conversion
+Builds a compact list of output row records (columns A-Q), applies the
+Step 4 cleanup rules to those records and only then writes the final
+rows to the output workbook.
+"""
+
+import io
+from dataclasses import dataclass
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+from cleanup_rules import get_tss_cleanup_rules
+from input_reader import InputSheet, ParsedInput, parse_input
+from row_dedup import DEFAULT_MEMORY_BUDGET, RowDeduplicator
+from step2_fill_product_info import fill_product_columns
+from step3_copy_data import fill_product_marks, get_column_projection
+from streamlit_ui_toolkit.templates import get_tss_compiled_template, get_tss_style_registry
+from streamlit_ui_toolkit.templates.presets import (
+    ARTICLE_STYLE, MARK_STYLE, PRODUCT_FILL_STYLE, PRODUCT_NAME_STYLE
+)
+
+OUTPUT_COLUMNS = 17     # A-Q
+DATA_START_ROW = 11     # Output data starts at row 11
+PRODUCT_START_COL = 18  # Column R
+PRODUCT_NAME_ROWS = 9   # Product names are merged over rows 1-9
+SHEET_NAME = "TSS Data"
+
+
+@dataclass
+class CleanupStats:
+    """Hit counters of the Step 4 cleanup rules"""
+    k_cleared: int = 0
+    art_filled: int = 0
+    q_cleared: int = 0
+    duplicates_removed: int = 0
+
+
+def collect_product_info(input_sheets: list[InputSheet]) -> tuple[list[str], list[str]]:
+    """Concatenate product names and article numbers of all input sheets"""
+    all_product_names = []
+    all_article_numbers = []
+
+    for input_sheet in input_sheets:
+        if input_sheet.product_names:
+            all_product_names.extend(input_sheet.product_names)
+        if input_sheet.article_numbers:
+            all_article_numbers.extend(input_sheet.article_numbers)
+
+    return all_product_names, all_article_numbers
+
+
+def build_output_rows(input_sheets: list[InputSheet]) -> list[list]:
+    """Map input data rows to output row records (17 values, columns A-Q) with the compiled column mapping"""
+    project = get_column_projection().project
+    rows = []
+
+    for input_sheet in input_sheets:
+        for values in input_sheet.data_rows:
+            record = project(values)
+            if record is not None:
+                rows.append(record)
+
+    return rows
+
+
+def cleanup_rows(rows: list[list], dedup_memory_budget: int = DEFAULT_MEMORY_BUDGET) -> tuple[list[list], CleanupStats]:
+    """
+    Apply the Step 4 cleanup rules to output row records in one pass
+
+    - Rules of cleanup_rules.TSS_CLEANUP_RULES (clear K, fill 'Art', clear Q)
+    - Drop duplicate rows (A-Q), keeping the first occurrence
+      (RowDeduplicator, spills to disk past ``dedup_memory_budget`` bytes)
+    """
+    rules = get_tss_cleanup_rules()
+    apply_rules = rules.apply
+    counts = rules.new_counts()
+    dedup = RowDeduplicator(key=tuple, memory_budget=dedup_memory_budget)
+
+    for record in rows:
+        apply_rules(record, counts)
+        dedup.add(record)
+
+    kept = dedup.finish()
+    stats = CleanupStats(**rules.hits(counts), duplicates_removed=dedup.duplicates)
+
+    return kept, stats
+
+
+def create_output_workbook():
+    """Create the output workbook with the TSS 17-column template header"""
+    output_wb = openpyxl.Workbook()
+    output_ws = output_wb.active
+    output_ws.title = SHEET_NAME
+
+    get_tss_compiled_template().stamp(output_ws, get_tss_style_registry().bind(output_wb))
+
+    return output_wb
+
+
+def write_output_rows(output_ws, rows: list[list], num_products: int) -> None:
+    """Write final row records from DATA_START_ROW and mark every product with X"""
+    for row_idx, record in enumerate(rows, DATA_START_ROW):
+        for col_idx, value in enumerate(record, 1):
+            if value is not None:
+                output_ws.cell(row=row_idx, column=col_idx, value=value)
+
+    if num_products > 0 and rows:
+        fill_product_marks(output_ws, num_products, len(rows))
+
+
+def write_output_stream(output_wb, rows: list[list], product_names: list[str], article_numbers: list[str]) -> None:
+    """
+    Stream the complete output sheet into a write-only workbook
+
+    Rows are emitted in order (product header rows 1-9, template header
+    row 10, data rows) so no cell is kept in memory after it is written.
+    Styling, merges, widths, freeze panes and auto-filter match the
+    normal-mode workbook.
+    """
+    template = get_tss_compiled_template()
+    output_ws = output_wb.create_sheet(SHEET_NAME)
+
+    num_products = max(len(product_names), len(article_numbers))
+    product_cols = range(PRODUCT_START_COL, PRODUCT_START_COL + num_products)
+    names = [product_names[i] if i < len(product_names) else "" for i in range(num_products)]
+    articles = [article_numbers[i] if i < len(article_numbers) else "" for i in range(num_products)]
+
+    # Same registered styles as step2.fill_product_columns / step3.fill_product_marks
+    styles = get_tss_style_registry().bind(output_wb)
+
+    def styled(value, style_name):
+        return styles.apply(WriteOnlyCell(output_ws, value=value), style_name)
+
+    # Dimensions, merges, panes and filter must be set before the first row is written
+    template.apply_layout(output_ws)
+    for col, article in zip(product_cols, articles):
+        article_len = len(str(article)) if article else 0
+        output_ws.column_dimensions[get_column_letter(col)].width = max(article_len + 2, 10)
+        output_ws.merged_cells.add(f"{get_column_letter(col)}1:{get_column_letter(col)}{PRODUCT_NAME_ROWS}")
+
+    # Rows 1-9: product names (merged, rotated) on peach background
+    padding = [None] * (PRODUCT_START_COL - 1)
+    for row_idx in range(1, template.header_row):
+        if row_idx == 1:
+            product_cells = [styled(name, PRODUCT_NAME_STYLE) for name in names]
+        elif row_idx <= PRODUCT_NAME_ROWS:
+            product_cells = [styled(None, PRODUCT_FILL_STYLE) for _ in names]
+        else:
+            product_cells = []
+        output_ws.append(padding + product_cells if product_cells else [])
+
+    # Row 10: template header + article numbers
+    header_cells = template.header_cells(output_ws, styles)
+    header_cells += [None] * (PRODUCT_START_COL - 1 - len(header_cells))
+    header_cells += [styled(article, ARTICLE_STYLE) for article in articles]
+    output_ws.append(header_cells)
+
+    # Data rows + X marks
+    for record in rows:
+        marks = [styled("X", MARK_STYLE) for _ in product_cols]
+        output_ws.append(record + marks if marks else record)
+
+
+def render_workbook(rows: list[list],
+                    product_names: list[str],
+                    article_numbers: list[str],
+                    write_only: bool = True) -> bytes:
+    """
+    Render final row records and product info to xlsx bytes
+
+    Args:
+        rows: Cleaned output row records (columns A-Q)
+        product_names: Product names for columns R onwards
+        article_numbers: Article numbers for columns R onwards
+        write_only: Stream rows with a write-only workbook (flat memory);
+                    False builds a normal workbook in memory
+
+    Returns:
+        Output workbook as xlsx bytes
+    """
+    output_buffer = io.BytesIO()
+
+    if write_only:
+        output_wb = openpyxl.Workbook(write_only=True)
+        write_output_stream(output_wb, rows, product_names, article_numbers)
+    else:
+        num_products = max(len(product_names), len(article_numbers))
+        output_wb = create_output_workbook()
+        output_ws = output_wb.active
+        fill_product_columns(output_ws, product_names, article_numbers)
+        write_output_rows(output_ws, rows, num_products)
+
+    output_wb.save(output_buffer)
+    output_wb.close()
+
+    return output_buffer.getvalue()
+
+
+def convert(parsed_input: ParsedInput, progress_callback=None, write_only: bool = True) -> bytes:
+    """
+    Convert a parsed input file to a Standard TSS workbook
+
+    Args:
+        parsed_input: Input parsed by input_reader.parse_input
+        progress_callback: Optional callable(step, status) for steps 1-4
+        write_only: Emit the output with a write-only workbook (see render_workbook)
+
+    Returns:
+        Output workbook as xlsx bytes
+    """
+    if progress_callback:
+        progress_callback(1, "Collecting product info...")
+
+    product_names, article_numbers = collect_product_info(parsed_input.sheets)
+
+    if progress_callback:
+        progress_callback(2, "Copying data...")
+
+    rows = build_output_rows(parsed_input.sheets)
+
+    if progress_callback:
+        progress_callback(3, "Cleaning up data...")
+
+    rows, _ = cleanup_rows(rows)
+
+    if progress_callback:
+        progress_callback(4, "Writing workbook...")
+
+    return render_workbook(rows, product_names, article_numbers, write_only=write_only)
+
+
+def convert_bytes(file_bytes: bytes, progress_callback=None) -> bytes:
+    """
+    Parse and convert one input workbook (bytes in, xlsx bytes out)
+
+    Module-level so it can run in a worker process (see worker_pool).
+    """
+    parsed_input = parse_input(file_bytes, get_column_projection().input_columns)
+    return convert(parsed_input, progress_callback)
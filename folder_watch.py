@@ -0,0 +1,132 @@
+"""
+Folder Watch - Detect input files that finished landing in a folder
+Polls the folder (one os.scandir per tick, stat only) and reports a file
+once its size and mtime have been stable for a settle period, no Excel
+owner file (~$name) is present and, for .xlsx, the zip central directory
+is complete. Each content version of a file is reported once.
+"""
+
+import os
+import time
+import zipfile
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_POLL_INTERVAL = 1.0     # Seconds between folder scans
+DEFAULT_SETTLE_SECONDS = 2.0    # Size/mtime must be unchanged this long
+TEMP_PREFIX = "~$"              # Excel owner/temp files
+WATCH_SUFFIXES = (".xlsx", ".xls")
+
+
+def _signature(entry: os.DirEntry) -> tuple[int, int]:
+    stat = entry.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def is_complete_workbook(path: Path) -> bool:
+    """False while an .xlsx is still being written (no end of central directory yet)"""
+    if path.suffix.lower() != ".xlsx":
+        return True
+    try:
+        return zipfile.is_zipfile(path)
+    except OSError:
+        return False
+
+
+def is_locked(path: Path) -> bool:
+    """
+    True while Excel has the file open (owner file next to it)
+
+    Excel names the owner file ~$ + name, or replaces the first two
+    characters of longer names with ~$.
+    """
+    return (path.parent / f"{TEMP_PREFIX}{path.name[2:]}").exists() or \
+        (path.parent / f"{TEMP_PREFIX}{path.name}").exists()
+
+
+class FolderWatcher:
+    """
+    Debounced "new or changed file" detection for one folder
+
+    Example:
+        watcher = FolderWatcher("input")
+        while True:
+            for path in watcher.poll():
+                convert(path)
+            time.sleep(DEFAULT_POLL_INTERVAL)
+    """
+
+    def __init__(self,
+                 folder,
+                 suffixes: tuple[str, ...] = WATCH_SUFFIXES,
+                 settle_seconds: float = DEFAULT_SETTLE_SECONDS):
+        """
+        Initialize FolderWatcher
+
+        Args:
+            folder: Folder to watch (not recursive)
+            suffixes: File suffixes to report (case-insensitive)
+            settle_seconds: Time a file's size and mtime must stay unchanged
+        """
+        self.folder = Path(folder)
+        self.suffixes = tuple(s.lower() for s in suffixes)
+        self.settle_seconds = settle_seconds
+
+        self._changing: dict[str, tuple[tuple[int, int], float]] = {}  # name -> (signature, since)
+        self._reported: dict[str, tuple[int, int]] = {}                 # name -> reported signature
+
+    def poll(self, now: Optional[float] = None) -> list[Path]:
+        """Return files that became ready since the last poll (sorted by name)"""
+        now = time.monotonic() if now is None else now
+        present = set()
+        ready = []
+
+        try:
+            entries = list(os.scandir(self.folder))
+        except FileNotFoundError:
+            entries = []
+
+        for entry in entries:
+            name = entry.name
+            if name.startswith(TEMP_PREFIX) or not name.lower().endswith(self.suffixes):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                signature = _signature(entry)
+            except FileNotFoundError:
+                continue
+
+            present.add(name)
+            if self._reported.get(name) == signature:
+                continue
+
+            # Debounce: wait until size and mtime stop changing
+            previous = self._changing.get(name)
+            if previous is None or previous[0] != signature:
+                self._changing[name] = (signature, now)
+                continue
+            if now - previous[1] < self.settle_seconds:
+                continue
+
+            path = Path(entry.path)
+            if is_locked(path) or not is_complete_workbook(path):
+                continue
+
+            del self._changing[name]
+            self._reported[name] = signature
+            ready.append(path)
+
+        # Forget deleted files so a re-added file is reported again
+        for name in set(self._changing) - present:
+            del self._changing[name]
+        for name in set(self._reported) - present:
+            del self._reported[name]
+
+        return sorted(ready)
+
+    def forget(self, path) -> None:
+        """Report ``path`` again once it is stable (e.g. it changed while being converted)"""
+        name = Path(path).name
+        self._reported.pop(name, None)
+        self._changing.pop(name, None)
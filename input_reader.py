@@ -0,0 +1,629 @@
+"""
+Input Reader - Streaming access to TALIMEX Internal TSS input workbooks
+Each sheet is consumed once as value tuples, so memory is bounded by the
+rows kept for the output, not by the input workbook.
+
+Reader engines:
+- xml: iterparses the sheet XML inside the xlsx zip and only decodes the
+  requested cells (fastest, handles plain values/strings/dates/formulas)
+- openpyxl: openpyxl read-only mode (handles everything openpyxl does)
+- auto: xml, falling back to openpyxl when the workbook uses a feature
+  the xml engine cannot read
+"""
+
+import io
+import posixpath
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
+from xml.etree.ElementTree import iterparse, fromstring
+from openpyxl import load_workbook
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import from_excel, from_ISO8601, WINDOWS_EPOCH, MAC_EPOCH
+
+MATERIAL_CODE_SHEET = "material code"
+PRODUCT_INFO_ROWS = 3       # Product name / Article number are in rows 1-3
+PRODUCT_INFO_COLUMNS = 19   # Labels are searched in columns A-S
+PRODUCT_VALUE_OFFSET = 3    # Value sits 1-3 columns right of its label
+DATA_START_ROW = 10         # Data starts at row 10 in the input
+
+# Columns scanned in rows 1-3: label columns plus the value offset
+PRODUCT_INFO_SCAN_COLUMNS = tuple(range(1, PRODUCT_INFO_COLUMNS + PRODUCT_VALUE_OFFSET + 1))
+
+DEFAULT_ENGINE = "auto"
+
+InputSource = Union[bytes, str, Path]
+
+SHEET_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_ROW_TAG = f"{{{SHEET_MAIN_NS}}}row"
+_CELL_TAG = f"{{{SHEET_MAIN_NS}}}c"
+_VALUE_TAG = f"{{{SHEET_MAIN_NS}}}v"
+_FORMULA_TAG = f"{{{SHEET_MAIN_NS}}}f"
+_INLINE_TAG = f"{{{SHEET_MAIN_NS}}}is"
+_TEXT_TAG = f"{{{SHEET_MAIN_NS}}}t"
+_RUN_TAG = f"{{{SHEET_MAIN_NS}}}r"
+_STRING_ITEM_TAG = f"{{{SHEET_MAIN_NS}}}si"
+_SHEET_DATA_TAG = f"{{{SHEET_MAIN_NS}}}sheetData"
+
+
+class UnsupportedWorkbook(Exception):
+    """Raised by a reader engine when the workbook uses a feature it cannot read"""
+
+
+@dataclass(frozen=True)
+class RowBand:
+    """Rows ``first``..``last`` (None = until the end) and the columns to read from them"""
+    first: int
+    last: Optional[int]
+    columns: tuple[int, ...]
+    data_only: bool = False         # Cached value of formula cells, whatever the reader's data_only
+
+    def contains(self, row_idx: int) -> bool:
+        return row_idx >= self.first and (self.last is None or row_idx <= self.last)
+
+
+@dataclass
+class InputSheet:
+    """Product info and mapped data rows read from one input sheet"""
+    name: str
+    product_names: list[str] = field(default_factory=list)
+    article_numbers: list[str] = field(default_factory=list)
+    data_rows: list[tuple] = field(default_factory=list)
+
+
+@dataclass
+class ParsedInput:
+    """Everything header validation and conversion need from one input file, parsed once"""
+    sheets: list[InputSheet]
+    header_values: dict[int, Any] = field(default_factory=dict)
+
+
+def _open_source(source: InputSource):
+    """Wrap raw bytes in a file object, pass paths through"""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return source
+
+
+def _band_for(bands: tuple[RowBand, ...], row_idx: int) -> Optional[RowBand]:
+    for band in bands:
+        if band.contains(row_idx):
+            return band
+    return None
+
+
+def _last_row(bands: tuple[RowBand, ...]) -> Optional[int]:
+    if any(band.last is None for band in bands):
+        return None
+    return max(band.last for band in bands)
+
+
+class OpenpyxlEngine:
+    """Reader engine on top of openpyxl read-only mode"""
+
+    name = "openpyxl"
+
+    def __init__(self, source: InputSource, data_only: bool = False):
+        self._source = source
+        self.data_only = data_only
+        self._wb = load_workbook(_open_source(source), read_only=True, data_only=data_only)
+        self._values_wb = None      # data_only twin for data_only bands, loaded on demand
+
+    @property
+    def sheet_names(self) -> list[str]:
+        return [ws.title for ws in self._wb.worksheets]
+
+    @property
+    def active_sheet_name(self) -> Optional[str]:
+        ws = self._wb.active
+        return ws.title if ws in self._wb.worksheets else None
+
+    def iter_rows(self, sheet_name: str, bands: tuple[RowBand, ...]) -> Iterator[tuple[int, tuple]]:
+        """Yield (row number, values of the band's columns) for rows inside ``bands``"""
+        # A read-only workbook has either formulas or cached values: data_only
+        # bands are read from a data_only twin of the workbook
+        value_bands = () if self.data_only else tuple(band for band in bands if band.data_only)
+        if not value_bands:
+            yield from self._iter_band_rows(self._wb, sheet_name, bands)
+            return
+
+        if self._values_wb is None:
+            self._values_wb = load_workbook(_open_source(self._source), read_only=True, data_only=True)
+        cached_values = dict(self._iter_band_rows(self._values_wb, sheet_name, value_bands))
+        for row_idx, values in self._iter_band_rows(self._wb, sheet_name, bands):
+            band = _band_for(bands, row_idx)
+            if band.data_only:
+                values = cached_values.get(row_idx, (None,) * len(band.columns))
+            yield row_idx, values
+
+    @staticmethod
+    def _iter_band_rows(wb, sheet_name: str, bands: tuple[RowBand, ...]) -> Iterator[tuple[int, tuple]]:
+        ws = wb[sheet_name]
+
+        # The <dimension> tag can be wrong, iterate until the real end of data
+        ws.reset_dimensions()
+
+        first = min(band.first for band in bands)
+        min_col = min(min(band.columns) for band in bands)
+        max_col = max(max(band.columns) for band in bands)
+        rows = ws.iter_rows(min_row=first, max_row=_last_row(bands),
+                            min_col=min_col, max_col=max_col, values_only=True)
+
+        for row_idx, row in enumerate(rows, first):
+            band = _band_for(bands, row_idx)
+            if band is not None:
+                yield row_idx, tuple(row[col - min_col] for col in band.columns)
+
+    def close(self) -> None:
+        self._wb.close()
+        if self._values_wb is not None:
+            self._values_wb.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _column_index(ref: str) -> int:
+    """Column index (1-based) of a cell reference such as 'AB12'"""
+    col = 0
+    for ch in ref:
+        if ch <= '9':
+            break
+        col = col * 26 + (ord(ch) - 64)
+    return col
+
+
+def _text_content(node) -> str:
+    """Plain text of a <si>/<is> node (rich text runs joined, phonetic runs skipped)"""
+    snippets = []
+    for child in node:
+        if child.tag == _TEXT_TAG:
+            snippets.append(child.text or "")
+        elif child.tag == _RUN_TAG:
+            snippets.append(child.findtext(_TEXT_TAG) or "")
+    return "".join(snippets)
+
+
+class XmlEngine:
+    """
+    Reader engine that iterparses xl/worksheets/sheetN.xml directly
+
+    Only the cells requested through RowBand columns are decoded; no
+    openpyxl cell objects are created. Shared strings are streamed only
+    up to the highest index a decoded cell needs. Raises
+    UnsupportedWorkbook for strict OOXML, shared/array formulas in
+    requested cells (unless data_only) and other features it does not
+    reproduce exactly like openpyxl.
+    """
+
+    name = "xml"
+
+    def __init__(self, source: InputSource, data_only: bool = False):
+        self.data_only = data_only
+        self._zip = zipfile.ZipFile(_open_source(source))
+        try:
+            self._load_workbook_part()
+        except Exception as e:
+            self._zip.close()
+            if isinstance(e, UnsupportedWorkbook):
+                raise
+            raise UnsupportedWorkbook(f"Workbook structure not supported: {e}") from e
+        self._shared_strings = []
+        self._pending_strings = self._iter_shared_strings()
+        self._date_styles = None
+
+    def _read_xml(self, path: str):
+        return fromstring(self._zip.read(path))
+
+    def _load_rels(self, part_path: str) -> dict[str, tuple[str, str]]:
+        """Relationship id -> (type, absolute part path) for a package part"""
+        folder, name = posixpath.split(part_path)
+        rels_path = posixpath.join(folder, "_rels", f"{name}.rels")
+        rels = {}
+        for rel in self._read_xml(rels_path).iter(f"{{{PKG_REL_NS}}}Relationship"):
+            target = rel.get("Target")
+            if target.startswith("/"):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join(folder, target))
+            rels[rel.get("Id")] = (rel.get("Type").rsplit("/", 1)[-1], target)
+        return rels
+
+    def _load_workbook_part(self) -> None:
+        workbook_path = "xl/workbook.xml"
+        for rel in self._read_xml("_rels/.rels").iter(f"{{{PKG_REL_NS}}}Relationship"):
+            if rel.get("Type", "").endswith("/officeDocument"):
+                workbook_path = rel.get("Target").lstrip("/")
+
+        root = self._read_xml(workbook_path)
+        if root.tag != f"{{{SHEET_MAIN_NS}}}workbook":
+            raise UnsupportedWorkbook(f"Unsupported workbook namespace: {root.tag}")
+
+        rels = self._load_rels(workbook_path)
+        self._part_paths = {rel_type: path for rel_type, path in rels.values()}
+
+        pr = root.find(f"{{{SHEET_MAIN_NS}}}workbookPr")
+        date1904 = pr is not None and pr.get("date1904") in ("1", "true")
+        self._epoch = MAC_EPOCH if date1904 else WINDOWS_EPOCH
+
+        self._sheets = {}
+        all_sheets = []
+        for sheet in root.iter(f"{{{SHEET_MAIN_NS}}}sheet"):
+            rel_type, path = rels[sheet.get(f"{{{REL_NS}}}id")]
+            all_sheets.append(sheet.get("name"))
+            if rel_type == "worksheet":
+                self._sheets[sheet.get("name")] = path
+
+        # Same rule as openpyxl: first workbookView with an activeTab, else the first sheet
+        active_tab = 0
+        for view in root.iter(f"{{{SHEET_MAIN_NS}}}workbookView"):
+            if view.get("activeTab") is not None:
+                active_tab = int(view.get("activeTab"))
+                break
+        active = all_sheets[active_tab] if active_tab < len(all_sheets) else None
+        self._active_sheet_name = active if active in self._sheets else None
+
+    @property
+    def sheet_names(self) -> list[str]:
+        return list(self._sheets)
+
+    @property
+    def active_sheet_name(self) -> Optional[str]:
+        return self._active_sheet_name
+
+    def _iter_shared_strings(self) -> Iterator[str]:
+        path = self._part_paths.get("sharedStrings")
+        if not path:
+            return
+        with self._zip.open(path) as src:
+            for _, node in iterparse(src):
+                if node.tag == _STRING_ITEM_TAG:
+                    yield _text_content(node).replace('x005F_', '')
+                    node.clear()
+
+    def _shared_string(self, idx: int) -> str:
+        """Shared string ``idx``; the table is only parsed up to that index"""
+        strings = self._shared_strings
+        while idx >= len(strings) and self._pending_strings is not None:
+            text = next(self._pending_strings, None)
+            if text is None:
+                self._pending_strings = None
+                break
+            strings.append(text)
+        return strings[idx]
+
+    @property
+    def shared_strings(self) -> list[str]:
+        """Complete shared string table"""
+        if self._pending_strings is not None:
+            self._shared_strings.extend(self._pending_strings)
+            self._pending_strings = None
+        return self._shared_strings
+
+    @property
+    def date_styles(self) -> tuple[set[int], set[int]]:
+        """Indexes of cell styles (cellXfs) with date and timedelta number formats"""
+        if self._date_styles is None:
+            date_formats, timedelta_formats = set(), set()
+            path = self._part_paths.get("styles")
+            if path:
+                root = self._read_xml(path)
+                custom = {
+                    int(fmt.get("numFmtId")): fmt.get("formatCode")
+                    for fmt in root.iter(f"{{{SHEET_MAIN_NS}}}numFmt")
+                }
+                cell_xfs = root.find(f"{{{SHEET_MAIN_NS}}}cellXfs")
+                xfs = cell_xfs.findall(f"{{{SHEET_MAIN_NS}}}xf") if cell_xfs is not None else []
+                for idx, xf in enumerate(xfs):
+                    fmt_id = int(xf.get("numFmtId", 0))
+                    fmt = custom.get(fmt_id, BUILTIN_FORMATS.get(fmt_id))
+                    if fmt is None:
+                        continue
+                    if is_date_format(fmt):
+                        date_formats.add(idx)
+                    if is_timedelta_format(fmt):
+                        timedelta_formats.add(idx)
+            self._date_styles = (date_formats, timedelta_formats)
+        return self._date_styles
+
+    def _cell_value(self, cell, data_only: bool = False):
+        """Decode one <c> element the same way openpyxl (with the same data_only) does"""
+        formula = cell.find(_FORMULA_TAG) if not (self.data_only or data_only) else None
+        if formula is not None:
+            if formula.get("t") in ("shared", "array", "dataTable"):
+                raise UnsupportedWorkbook(f"{formula.get('t')} formula in cell {cell.get('r')}")
+            return "=" + (formula.text or "")
+
+        data_type = cell.get("t", "n")
+        if data_type == "inlineStr":
+            node = cell.find(_INLINE_TAG)
+            return _text_content(node) if node is not None else None
+
+        value = cell.findtext(_VALUE_TAG) or None
+        if value is None:
+            return None
+
+        if data_type == "n":
+            value = float(value) if ("." in value or "E" in value or "e" in value) else int(value)
+            style_id = int(cell.get("s", 0))
+            date_formats, timedelta_formats = self.date_styles
+            if style_id in date_formats:
+                try:
+                    return from_excel(value, self._epoch, timedelta=style_id in timedelta_formats)
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return value
+        if data_type == "s":
+            return self._shared_string(int(value))
+        if data_type == "b":
+            return bool(int(value))
+        if data_type == "d":
+            return from_ISO8601(value)
+        return value  # "str", "e"
+
+    def iter_rows(self, sheet_name: str, bands: tuple[RowBand, ...]) -> Iterator[tuple[int, tuple]]:
+        """Yield (row number, values of the band's columns) for rows inside ``bands``"""
+        last = _last_row(bands)
+        positions = {
+            band: {col: pos for pos, col in enumerate(band.columns)}
+            for band in bands
+        }
+
+        row_idx = 0
+        with self._zip.open(self._sheets[sheet_name]) as src:
+            sheet_data = None
+            for event, element in iterparse(src, events=("start", "end")):
+                if event == "start":
+                    if element.tag == _SHEET_DATA_TAG:
+                        sheet_data = element
+                    continue
+                if element.tag != _ROW_TAG:
+                    continue
+
+                r = element.get("r")
+                row_idx = int(r) if r else row_idx + 1
+                if last is not None and row_idx > last:
+                    break
+
+                band = _band_for(bands, row_idx)
+                if band is not None:
+                    wanted = positions[band]
+                    values = [None] * len(band.columns)
+                    col_idx = 0
+                    for cell in element:
+                        if cell.tag != _CELL_TAG:
+                            continue
+                        ref = cell.get("r")
+                        col_idx = _column_index(ref) if ref else col_idx + 1
+                        pos = wanted.get(col_idx)
+                        if pos is not None:
+                            values[pos] = self._cell_value(cell, band.data_only)
+                    yield row_idx, tuple(values)
+
+                # Drop parsed rows so the tree never grows past one row
+                if sheet_data is not None:
+                    sheet_data.clear()
+                else:
+                    element.clear()
+
+    def close(self) -> None:
+        if self._pending_strings is not None:
+            self._pending_strings.close()
+            self._pending_strings = None
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+READER_ENGINES = {
+    OpenpyxlEngine.name: OpenpyxlEngine,
+    XmlEngine.name: XmlEngine,
+}
+
+
+def open_reader(source: InputSource, engine: str = "openpyxl", data_only: bool = False):
+    """
+    Open ``source`` with a concrete reader engine ('xml' or 'openpyxl')
+
+    ``data_only`` returns the cached value of formula cells instead of
+    the formula, like openpyxl's data_only.
+    """
+    if engine not in READER_ENGINES:
+        raise ValueError(f"Unknown reader engine: {engine}")
+    return READER_ENGINES[engine](source, data_only=data_only)
+
+
+def is_not_material_code(sheet_name: str) -> bool:
+    """Sheet predicate: every sheet except 'material code' (case insensitive)"""
+    return sheet_name.lower() != MATERIAL_CODE_SHEET
+
+
+def load_sheets(source: InputSource,
+                columns: Iterable[int],
+                rows: tuple[int, Optional[int]] = (1, None),
+                sheet_predicate: Optional[Callable[[str], bool]] = None,
+                engine: str = DEFAULT_ENGINE) -> dict[str, list[tuple[int, tuple]]]:
+    """
+    Load a row range x column set from the sheets selected by a predicate
+
+    Sheets rejected by ``sheet_predicate`` are never parsed; with the xml
+    engine, cells outside ``columns`` and rows outside ``rows`` are never
+    decoded either.
+
+    Args:
+        source: Workbook bytes or path
+        columns: Column indexes (1-based); values are returned in this order
+        rows: (first, last) row numbers, last=None reads to the end
+        sheet_predicate: Called with each sheet name, None selects all sheets
+        engine: 'auto', 'xml' or 'openpyxl'
+
+    Returns:
+        Sheet name -> list of (row number, values) in workbook order. Rows
+        without a value in ``columns`` may or may not be included: openpyxl
+        pads missing rows up to ``rows[1]``, the xml engine does not.
+
+    Example:
+        sheets = load_sheets("input/file.xlsx", columns=[2, 4, 5], rows=(10, None),
+                             sheet_predicate=is_not_material_code)
+    """
+    if engine == "auto":
+        try:
+            return load_sheets(source, columns, rows, sheet_predicate, engine=XmlEngine.name)
+        except UnsupportedWorkbook:
+            engine = OpenpyxlEngine.name
+
+    bands = (RowBand(rows[0], rows[1], tuple(columns)),)
+    sheets = {}
+
+    with open_reader(source, engine) as reader:
+        for sheet_name in reader.sheet_names:
+            if sheet_predicate is None or sheet_predicate(sheet_name):
+                sheets[sheet_name] = list(reader.iter_rows(sheet_name, bands))
+
+    return sheets
+
+
+def read_header_values(source: InputSource,
+                       header_row: int,
+                       header_columns: Iterable[int],
+                       engine: str = DEFAULT_ENGINE) -> dict[int, Any]:
+    """
+    Probe the header row of the active sheet only
+
+    With the xml engine only the active sheet is streamed, parsing stops
+    after ``header_row`` and the shared string table is read only up to
+    the highest index the header cells use. Formula cells give their
+    cached value (same as openpyxl data_only=True).
+
+    Args:
+        source: Workbook bytes or path
+        header_row: Row number to read
+        header_columns: Column indexes (1-based) to read
+        engine: 'auto', 'xml' or 'openpyxl'
+
+    Returns:
+        Header column -> value (None for empty cells)
+    """
+    if engine == "auto":
+        try:
+            return read_header_values(source, header_row, header_columns, engine=XmlEngine.name)
+        except UnsupportedWorkbook:
+            engine = OpenpyxlEngine.name
+
+    header_columns = tuple(header_columns)
+    header_values = dict.fromkeys(header_columns)
+
+    with open_reader(source, engine, data_only=True) as reader:
+        sheet_name = reader.active_sheet_name
+        if sheet_name is None:
+            raise ValueError("The active sheet is not a worksheet")
+        for _, values in reader.iter_rows(sheet_name, (RowBand(header_row, header_row, header_columns),)):
+            header_values.update(zip(header_columns, values))
+
+    return header_values
+
+
+def find_product_info(rows: list[tuple]) -> tuple[list[str], list[str]]:
+    """Find Product name and Article number in the first 3 rows (value tuples)"""
+    product_names = []
+    article_numbers = []
+
+    for row in rows[:PRODUCT_INFO_ROWS]:
+        for col in range(1, min(len(row) + 1, PRODUCT_INFO_COLUMNS + 1)):
+            cell_value = row[col - 1]
+            if cell_value:
+                cell_str = str(cell_value).lower().strip()
+                if "product name" in cell_str:
+                    for value in row[col:col + PRODUCT_VALUE_OFFSET]:
+                        if value:
+                            product_names = [p.strip() for p in str(value).split('\n') if p.strip()]
+                            break
+                elif "article number" in cell_str:
+                    for value in row[col:col + PRODUCT_VALUE_OFFSET]:
+                        if value:
+                            article_numbers = [str(a).strip() for a in str(value).split('\n') if str(a).strip()]
+                            break
+
+    return product_names, article_numbers
+
+
+def parse_input(source: InputSource,
+                columns: list[int],
+                header_row: Optional[int] = None,
+                header_columns: tuple[int, ...] = (),
+                engine: str = DEFAULT_ENGINE) -> ParsedInput:
+    """
+    Parse an input workbook once for both header validation and conversion
+
+    Every sheet except 'material code' is streamed once. The header row of
+    the active sheet is picked up during the same pass (the active sheet is
+    still probed for its header when it is the 'material code' sheet).
+
+    Args:
+        source: Workbook bytes or path
+        columns: Input column indexes (1-based) to keep for each data row
+        header_row: Row of the active sheet to read header values from
+        header_columns: Columns of ``header_row`` to read
+        engine: 'auto', 'xml' or 'openpyxl'
+
+    Returns:
+        ParsedInput with one InputSheet per sheet. Data rows hold the values
+        of ``columns`` (in that order); rows where all of them are empty are
+        dropped. ``header_values`` maps header column -> value.
+    """
+    if engine == "auto":
+        try:
+            return parse_input(source, columns, header_row, header_columns, engine=XmlEngine.name)
+        except UnsupportedWorkbook:
+            engine = OpenpyxlEngine.name
+
+    data_bands = (
+        RowBand(1, PRODUCT_INFO_ROWS, PRODUCT_INFO_SCAN_COLUMNS),
+        RowBand(DATA_START_ROW, None, tuple(columns)),
+    )
+    # Header cells are validated by their cached values, like read_header_values
+    header_band = (RowBand(header_row, header_row, tuple(header_columns), data_only=True)
+                   if header_row and header_columns else None)
+    parsed = ParsedInput(sheets=[])
+
+    with open_reader(source, engine) as reader:
+        active_sheet_name = reader.active_sheet_name if header_band else None
+
+        for sheet_name in reader.sheet_names:
+            is_material_code = not is_not_material_code(sheet_name)
+            is_active = sheet_name == active_sheet_name
+            if is_material_code and not is_active:
+                continue
+
+            bands = () if is_material_code else data_bands
+            if is_active:
+                bands = (header_band,) + bands
+
+            sheet = InputSheet(name=sheet_name)
+            head_rows = []
+
+            for row_idx, values in reader.iter_rows(sheet_name, bands):
+                if is_active and row_idx == header_row:
+                    parsed.header_values = dict(zip(header_band.columns, values))
+                elif row_idx <= PRODUCT_INFO_ROWS:
+                    head_rows.append(values)
+                elif any(values):
+                    sheet.data_rows.append(values)
+
+            if not is_material_code:
+                sheet.product_names, sheet.article_numbers = find_product_info(head_rows)
+                parsed.sheets.append(sheet)
+
+    return parsed
+
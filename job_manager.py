@@ -0,0 +1,263 @@
+"""
+Job Manager - Background conversion jobs shared by all app sessions
+Jobs run on runner threads instead of the Streamlit script thread, so a
+rerun or any widget interaction does not interrupt them. A session keeps
+the ids of its jobs and polls snapshots for progress and results; finished
+jobs are kept until the session releases them or they expire.
+
+Queued jobs wait in one queue per session and are started round-robin
+across sessions, so one session's large batch cannot starve the others.
+The total number of queued jobs is limited; past the limit submissions
+are refused with QueueFull.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Optional
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+FINISHED_STATES = frozenset({DONE, FAILED})
+
+JOB_RETENTION = 60 * 60         # Seconds a finished job waits for its session
+DEFAULT_QUEUE_DEPTH = 32        # Queued (not yet running) jobs of all sessions
+JOB_WORKERS_ENV = "TSS_JOB_WORKERS"
+QUEUE_DEPTH_ENV = "TSS_JOB_QUEUE_DEPTH"
+
+
+def default_job_workers() -> int:
+    """Worker count: $TSS_JOB_WORKERS, else the CPU count capped at 4"""
+    env_value = os.environ.get(JOB_WORKERS_ENV)
+    if env_value:
+        return max(int(env_value), 1)
+    return min(os.cpu_count() or 1, 4)
+
+
+def default_queue_depth() -> int:
+    """Queue depth limit: $TSS_JOB_QUEUE_DEPTH, else DEFAULT_QUEUE_DEPTH"""
+    env_value = os.environ.get(QUEUE_DEPTH_ENV)
+    if env_value:
+        return max(int(env_value), 1)
+    return DEFAULT_QUEUE_DEPTH
+
+
+class QueueFull(Exception):
+    """The job queue is at its depth limit"""
+
+    def __init__(self, position: int, max_queued: int):
+        self.position = position
+        self.max_queued = max_queued
+        super().__init__(
+            f"The server is busy: your files would be at position {position} in the queue "
+            f"(limit {max_queued}). Please try again in a few minutes."
+        )
+
+
+@dataclass
+class Job:
+    """State of one background job (JobManager hands out copies)"""
+    job_id: str
+    session_id: str
+    name: str
+    state: str = QUEUED
+    step: int = 0
+    steps: int = 4
+    status: str = "Queued"
+    position: int = 0               # Place in the start order while queued (1 = next)
+    result: Any = None
+    error: Optional[str] = None
+    submitted_at: float = 0.0
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    @property
+    def progress(self) -> float:
+        """Fraction done, 0.0-1.0"""
+        if self.finished:
+            return 1.0
+        return min(self.step / self.steps, 1.0) if self.steps else 0.0
+
+
+@dataclass
+class _Task:
+    job: Job
+    fn: Callable
+    args: tuple
+
+
+class JobManager:
+    """
+    Run jobs on a fixed number of runner threads with fair per-session queues
+
+    A job function is called as ``fn(*args, progress_callback)``; the
+    callback takes ``(step, status)`` like converter.convert.
+
+    Example:
+        manager = JobManager(max_workers=4)
+        job_id = manager.submit(session_id, "a.xlsx", convert_upload, data)  # raises QueueFull
+        job = manager.get(job_id)
+        if job.finished:
+            manager.release([job_id])
+    """
+
+    def __init__(self,
+                 max_workers: int = 2,
+                 max_queued: int = DEFAULT_QUEUE_DEPTH,
+                 retention: float = JOB_RETENTION):
+        """
+        Initialize JobManager
+
+        Args:
+            max_workers: Jobs running at the same time
+            max_queued: Jobs waiting to start, over all sessions
+            retention: Seconds a finished job is kept for its session
+        """
+        self.max_workers = max(max_workers, 1)
+        self.max_queued = max(max_queued, 1)
+        self.retention = retention
+        self._cond = threading.Condition()
+        self._jobs: dict[str, Job] = {}
+        self._queues: OrderedDict[str, deque[_Task]] = OrderedDict()  # session -> queued tasks
+        self._queued = 0
+        self._closed = False
+        self._runners = [
+            threading.Thread(target=self._runner, name=f"tss-job-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for runner in self._runners:
+            runner.start()
+
+    @property
+    def queued(self) -> int:
+        with self._cond:
+            return self._queued
+
+    def submit(self, session_id: str, name: str, fn: Callable, *args) -> str:
+        """Queue ``fn(*args, progress_callback)``; returns the job id, raises QueueFull"""
+        return self.submit_many(session_id, [(name, fn, args)])[0]
+
+    def submit_many(self, session_id: str, tasks: list[tuple[str, Callable, tuple]]) -> list[str]:
+        """
+        Queue several (name, fn, args) jobs of one session, all or none
+
+        Raises:
+            QueueFull: The queue has no room for all of them
+        """
+        if not tasks:
+            return []
+        now = time.time()
+        with self._cond:
+            if self._queued + len(tasks) > self.max_queued:
+                raise QueueFull(self._queued + 1, self.max_queued)
+            self._prune()
+            queue = self._queues.setdefault(session_id, deque())
+            job_ids = []
+            for name, fn, args in tasks:
+                job = Job(job_id=uuid.uuid4().hex, session_id=session_id, name=name, submitted_at=now)
+                self._jobs[job.job_id] = job
+                queue.append(_Task(job, fn, args))
+                job_ids.append(job.job_id)
+            self._queued += len(tasks)
+            self._cond.notify(len(tasks))
+        return job_ids
+
+    def _next_task(self) -> _Task:
+        """Round-robin: first task of the session served longest ago (lock held)"""
+        session_id, tasks = next(iter(self._queues.items()))
+        task = tasks.popleft()
+        if tasks:
+            self._queues.move_to_end(session_id)
+        else:
+            del self._queues[session_id]
+        self._queued -= 1
+        return task
+
+    def _start_order(self) -> list[Job]:
+        """Queued jobs in the order they will start (lock held)"""
+        order = []
+        queues = [list(tasks) for tasks in self._queues.values()]
+        for depth in range(max(map(len, queues), default=0)):
+            order.extend(tasks[depth].job for tasks in queues if depth < len(tasks))
+        return order
+
+    def _runner(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queued and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                task = self._next_task()
+                task.job.state = RUNNING
+                task.job.status = "Starting..."
+            self._run(task)
+
+    def _update(self, job: Job, **changes) -> None:
+        with self._cond:
+            for key, value in changes.items():
+                setattr(job, key, value)
+
+    def _run(self, task: _Task) -> None:
+        job = task.job
+
+        def progress_callback(step, status):
+            self._update(job, step=step, status=status)
+
+        try:
+            result = task.fn(*task.args, progress_callback)
+        except Exception as e:
+            self._update(job, state=FAILED, error=str(e), status="Failed", finished_at=time.time())
+        else:
+            self._update(job, state=DONE, result=result, status="Done", finished_at=time.time())
+
+    def _snapshot(self, job: Job, positions: dict) -> Job:
+        snapshot = replace(job)
+        if job.state == QUEUED:
+            snapshot.position = positions[job.job_id]
+            snapshot.status = f"Waiting in queue (position {snapshot.position})"
+        return snapshot
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Snapshot of a job, None if it is unknown (released or expired)"""
+        jobs = self.jobs([job_id])
+        return jobs[0] if jobs else None
+
+    def jobs(self, job_ids) -> list[Job]:
+        """Snapshots of the known jobs among ``job_ids``, in that order"""
+        with self._cond:
+            positions = {job.job_id: pos for pos, job in enumerate(self._start_order(), 1)}
+            return [self._snapshot(self._jobs[job_id], positions) for job_id in job_ids if job_id in self._jobs]
+
+    def release(self, job_ids) -> None:
+        """Forget finished jobs (their results are dropped)"""
+        with self._cond:
+            for job_id in job_ids:
+                job = self._jobs.get(job_id)
+                if job is not None and job.finished:
+                    del self._jobs[job_id]
+
+    def _prune(self) -> None:
+        """Drop finished jobs older than the retention period (lock held)"""
+        expired = time.time() - self.retention
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < expired]:
+            del self._jobs[job_id]
+
+    def shutdown(self) -> None:
+        """Stop the runners after their current job; queued jobs are dropped"""
+        with self._cond:
+            self._closed = True
+            self._queues.clear()
+            self._queued = 0
+            self._cond.notify_all()
@@ -0,0 +1,285 @@
+"""
+Memory Budget - Admit conversion jobs by estimated peak memory
+The estimate comes from the xlsx zip central directory (uncompressed
+sizes of the worksheet XML and sharedStrings.xml) plus the <dimension>
+tag at the start of each worksheet, so no cell is parsed. Jobs are
+admitted while their estimates fit a RAM budget; a job larger than the
+whole budget runs alone, and small jobs fill the gaps next to big ones.
+"""
+
+import io
+import os
+import re
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+MB = 1024 * 1024
+
+JOB_OVERHEAD = 16 * MB          # Reader/writer buffers and workbook objects of one job
+ROW_BYTES = 1024                # One kept input row + its output record, dedup entry
+XML_BYTES_PER_ROW = 256         # Row count guess when a sheet has no <dimension> tag
+SHARED_STRING_FACTOR = 4        # Python str list vs. sharedStrings.xml size
+SOURCE_FACTOR = 3               # Input bytes + rendered output bytes
+MAX_BYPASS = 4                  # Times a waiting job may be overtaken by smaller ones
+DIMENSION_PROBE_BYTES = 4096
+MEMORY_BUDGET_ENV = "TSS_MEMORY_BUDGET_MB"
+
+_DIMENSION_RE = re.compile(rb'<(?:\w+:)?dimension\s+ref="[A-Z]*(\d*)(?::[A-Z]*(\d+))?"')
+
+
+@dataclass(frozen=True)
+class JobEstimate:
+    """Estimated peak memory of converting one input file"""
+    peak_bytes: int
+    source_bytes: int
+    sheet_xml_bytes: int
+    shared_strings_bytes: int
+    rows: int
+
+
+def _dimension_rows(zf: zipfile.ZipFile, name: str) -> Optional[int]:
+    """Row count from the <dimension ref> tag, None if the sheet has none"""
+    with zf.open(name) as f:
+        head = f.read(DIMENSION_PROBE_BYTES)
+    match = _DIMENSION_RE.search(head)
+    if match is None or not match.group(1):
+        return None
+    first = int(match.group(1))
+    last = int(match.group(2)) if match.group(2) else first
+    return last - first + 1
+
+
+def estimate_job_memory(source: Union[bytes, str, Path]) -> JobEstimate:
+    """
+    Estimate the peak memory of converting ``source`` (bytes or path)
+
+    Unreadable files get the fixed job overhead; the conversion itself
+    will report the error.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source_bytes = len(source)
+        source = io.BytesIO(source)
+    else:
+        source_bytes = os.path.getsize(source)
+
+    sheet_xml_bytes = shared_strings_bytes = rows = 0
+    try:
+        with zipfile.ZipFile(source) as zf:
+            for info in zf.infolist():
+                name = info.filename
+                if name.startswith("xl/worksheets/") and name.endswith(".xml") and "/_rels/" not in name:
+                    sheet_xml_bytes += info.file_size
+                    sheet_rows = _dimension_rows(zf, name)
+                    if sheet_rows is None or sheet_rows <= 1:
+                        sheet_rows = info.file_size // XML_BYTES_PER_ROW
+                    rows += sheet_rows
+                elif name.endswith("sharedStrings.xml"):
+                    shared_strings_bytes += info.file_size
+    except (OSError, zipfile.BadZipFile):
+        pass
+
+    peak_bytes = (
+        JOB_OVERHEAD
+        + source_bytes * SOURCE_FACTOR
+        + shared_strings_bytes * SHARED_STRING_FACTOR
+        + rows * ROW_BYTES
+    )
+    return JobEstimate(
+        peak_bytes=peak_bytes,
+        source_bytes=source_bytes,
+        sheet_xml_bytes=sheet_xml_bytes,
+        shared_strings_bytes=shared_strings_bytes,
+        rows=rows,
+    )
+
+
+def default_memory_limit() -> int:
+    """RAM budget: $TSS_MEMORY_BUDGET_MB, else half of the physical memory"""
+    env_value = os.environ.get(MEMORY_BUDGET_ENV)
+    if env_value:
+        return int(float(env_value) * MB)
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 2
+    except (ValueError, OSError, AttributeError):
+        return 2048 * MB
+
+
+class _Ticket:
+    __slots__ = ("cost", "bypassed")
+
+    def __init__(self, cost: int):
+        self.cost = cost
+        self.bypassed = 0
+
+
+class MemoryBudget:
+    """
+    Thread-safe RAM budget shared by concurrent jobs
+
+    A job costs its estimate, capped at the limit, so a job bigger than the
+    budget still runs, but alone. Waiting jobs are admitted in order except
+    that a smaller job that fits may overtake the oldest waiting job up to
+    MAX_BYPASS times.
+
+    Example:
+        budget = MemoryBudget(4096 * MB)
+        with budget.reservation(estimate.peak_bytes):
+            convert(...)
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(int(limit), 1)
+        self.used = 0
+        self._cond = threading.Condition()
+        self._waiting: deque[_Ticket] = deque()
+
+    def cost(self, estimate: int) -> int:
+        return min(max(int(estimate), 0), self.limit)
+
+    def _admissible(self, ticket: _Ticket) -> bool:
+        if self.used + ticket.cost > self.limit:
+            return False
+        head = self._waiting[0] if self._waiting else None
+        if head is None or head is ticket:
+            return True
+        if head.bypassed >= MAX_BYPASS:
+            return False
+        head.bypassed += 1
+        return True
+
+    def try_reserve(self, estimate: int) -> bool:
+        """Reserve without waiting; False if the job does not fit now"""
+        ticket = _Ticket(self.cost(estimate))
+        with self._cond:
+            if not self._admissible(ticket):
+                return False
+            self.used += ticket.cost
+            return True
+
+    def reserve(self, estimate: int, timeout: Optional[float] = None) -> bool:
+        """Wait until the job fits; False on timeout"""
+        ticket = _Ticket(self.cost(estimate))
+        with self._cond:
+            self._waiting.append(ticket)
+            try:
+                if not self._cond.wait_for(lambda: self._admissible(ticket), timeout):
+                    return False
+                self.used += ticket.cost
+                return True
+            finally:
+                self._waiting.remove(ticket)
+                self._cond.notify_all()
+
+    def release(self, estimate: int) -> None:
+        with self._cond:
+            self.used = max(self.used - self.cost(estimate), 0)
+            self._cond.notify_all()
+
+    def reservation(self, estimate: int) -> "_Reservation":
+        """Context manager: reserve (waiting as needed) and release on exit"""
+        return _Reservation(self, estimate)
+
+
+class _Reservation:
+    def __init__(self, budget: MemoryBudget, estimate: int):
+        self.budget = budget
+        self.estimate = estimate
+
+    def __enter__(self):
+        self.budget.reserve(self.estimate)
+        return self
+
+    def __exit__(self, *exc):
+        self.budget.release(self.estimate)
+
+
+@dataclass
+class _Job:
+    key: Any
+    estimate: int
+    fn: Callable
+    args: tuple
+    bypassed: int = 0
+
+
+class MemoryScheduler:
+    """
+    Submit jobs to an executor only while their estimates fit a MemoryBudget
+
+    Jobs are queued with ``add`` and started by ``wait``. Queued jobs start
+    in order; a later job that fits may start before an earlier one that
+    does not (at most MAX_BYPASS times per waiting job), and a job bigger
+    than the budget starts only when nothing else runs.
+
+    Example:
+        scheduler = MemoryScheduler(executor, max_workers=8, budget=budget)
+        for path in files:
+            scheduler.add(path, estimate_job_memory(path).peak_bytes, run_file, path)
+        while scheduler.has_work:
+            for key, future in scheduler.wait():
+                print(key, future.result())
+    """
+
+    def __init__(self, executor, max_workers: int, budget: MemoryBudget):
+        self.executor = executor
+        self.max_workers = max(max_workers, 1)
+        self.budget = budget
+        self._queued: list[_Job] = []
+        self._running: dict = {}  # future -> job
+
+    @property
+    def has_work(self) -> bool:
+        return bool(self._queued or self._running)
+
+    @property
+    def queued(self) -> int:
+        return len(self._queued)
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    def add(self, key, estimate: int, fn: Callable, *args) -> None:
+        """Queue ``fn(*args)`` with its estimated peak memory"""
+        self._queued.append(_Job(key, estimate, fn, args))
+
+    def _start(self, job: _Job) -> None:
+        self._queued.remove(job)
+        self._running[self.executor.submit(job.fn, *job.args)] = job
+
+    def _admit(self) -> None:
+        while self._queued and len(self._running) < self.max_workers:
+            head = self._queued[0]
+            if self.budget.try_reserve(head.estimate):
+                self._start(head)
+                continue
+            if head.bypassed >= MAX_BYPASS:
+                break
+            backfill = next((job for job in self._queued[1:] if self.budget.try_reserve(job.estimate)), None)
+            if backfill is None:
+                break
+            head.bypassed += 1
+            self._start(backfill)
+
+    def wait(self, timeout: Optional[float] = None) -> list[tuple[Any, Any]]:
+        """Start jobs that fit, then wait for at least one to finish; returns (key, future) pairs"""
+        self._admit()
+        if not self._running:
+            return []
+        done, _ = wait(self._running, timeout=timeout, return_when=FIRST_COMPLETED)
+        finished = []
+        for future in done:
+            job = self._running.pop(future)
+            self.budget.release(job.estimate)
+            finished.append((job.key, future))
+        self._admit()
+        return finished
+
+    def cancel(self) -> None:
+        """Drop queued jobs (running jobs are left to the executor)"""
+        self._queued.clear()
@@ -0,0 +1,191 @@
+"""
+Row Dedup - Memory-bounded "keep first occurrence" deduplication
+Rows are indexed by 128-bit fingerprints instead of full value tuples;
+a fingerprint match is always confirmed by comparing the real keys.
+Past the memory budget the fingerprint index is spilled to hash
+partitions in temporary files and resolved partition by partition.
+"""
+
+import hashlib
+import os
+import struct
+import tempfile
+from typing import Any, Callable, Optional, Sequence
+
+DIGEST_SIZE = 16                       # 128-bit fingerprints
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+DEFAULT_PARTITIONS = 64
+INDEX_ENTRY_BYTES = 120                # dict slot + 16-byte bytes object + int, approx.
+
+_RECORD = struct.Struct(f"<{DIGEST_SIZE}sQ")   # (fingerprint, sequence number)
+
+
+def _update(h, tag: bytes, payload: bytes) -> None:
+    h.update(tag)
+    h.update(len(payload).to_bytes(4, "little"))
+    h.update(payload)
+
+
+def row_fingerprint(key: Sequence) -> bytes:
+    """
+    128-bit fingerprint of a row key
+
+    Values that compare equal in Python get the same fingerprint
+    (e.g. 1, 1.0 and True), matching tuple equality used by a set.
+    """
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for value in key:
+        if value is None:
+            _update(h, b"N", b"")
+        elif isinstance(value, str):
+            _update(h, b"S", value.encode("utf-8", "surrogatepass"))
+        elif isinstance(value, (bool, int)) or (isinstance(value, float) and value.is_integer()):
+            _update(h, b"I", str(int(value)).encode())
+        elif isinstance(value, float):
+            _update(h, b"F", struct.pack("<d", value))
+        else:
+            _update(h, b"R", repr(value).encode("utf-8", "surrogatepass"))
+    return h.digest()
+
+
+class RowDeduplicator:
+    """
+    Keep-first-occurrence deduplication with a bounded fingerprint index
+
+    Items are added in order; ``finish()`` returns the items whose key was
+    not seen before, in their original order. Only a fingerprint and a
+    sequence number are indexed per distinct key. While the index fits in
+    ``memory_budget`` duplicates are detected on ``add``; past the budget
+    the index is spilled to ``partitions`` temporary files and duplicates
+    are resolved per partition in ``finish()``.
+
+    Example:
+        dedup = RowDeduplicator(key=tuple)
+        for record in rows:
+            dedup.add(record)
+        rows = dedup.finish()
+        print(dedup.duplicates)
+    """
+
+    def __init__(self,
+                 key: Callable[[Any], Sequence] = tuple,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 partitions: int = DEFAULT_PARTITIONS,
+                 spill_dir: Optional[str] = None):
+        """
+        Initialize RowDeduplicator
+
+        Args:
+            key: Returns the dedup key of an item; called again to confirm matches
+            memory_budget: Bytes allowed for the in-memory fingerprint index
+            partitions: Number of hash partitions used after spilling
+            spill_dir: Directory for spill files (default: system temp dir)
+        """
+        self.key = key
+        self.memory_budget = memory_budget
+        self.partitions = partitions
+        self.spill_dir = spill_dir
+        self.duplicates = 0
+
+        self._items = []
+        self._is_duplicate = bytearray()
+        self._index = {}          # fingerprint -> sequence number of first occurrence
+        self._collisions = {}     # full key -> sequence number (fingerprint collisions)
+        self._tmpdir = None
+        self._partition_files = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._partition_files is not None
+
+    def add(self, item) -> None:
+        """Add the next item"""
+        seq = len(self._items)
+        self._items.append(item)
+        self._is_duplicate.append(0)
+        digest = row_fingerprint(self.key(item))
+
+        if self.spilled:
+            self._write_record(digest, seq)
+            return
+
+        first = self._index.get(digest)
+        if first is None:
+            self._index[digest] = seq
+            if len(self._index) * INDEX_ENTRY_BYTES > self.memory_budget:
+                self._spill()
+            return
+
+        # Fingerprint match: confirm on the real keys
+        key = self.key(item)
+        if self.key(self._items[first]) == key or key in self._collisions:
+            self._is_duplicate[seq] = 1
+            self.duplicates += 1
+        else:
+            self._collisions[key] = seq
+
+    def _write_record(self, digest: bytes, seq: int) -> None:
+        self._partition_files[digest[0] % self.partitions].write(_RECORD.pack(digest, seq))
+
+    def _spill(self) -> None:
+        """Move the in-memory index to partition files"""
+        self._tmpdir = tempfile.TemporaryDirectory(prefix="tss-dedup-", dir=self.spill_dir)
+        self._partition_files = [
+            open(os.path.join(self._tmpdir.name, f"part-{i:03d}.bin"), "w+b")
+            for i in range(self.partitions)
+        ]
+
+        first_occurrences = [(seq, digest) for digest, seq in self._index.items()]
+        first_occurrences += [(seq, row_fingerprint(key)) for key, seq in self._collisions.items()]
+        for seq, digest in sorted(first_occurrences):
+            self._write_record(digest, seq)
+
+        self._index = {}
+        self._collisions = {}
+
+    def _resolve_partition(self, f) -> None:
+        """Mark duplicates of one spilled partition (records are in sequence order)"""
+        f.seek(0)
+        firsts = {}
+        while True:
+            chunk = f.read(_RECORD.size * 4096)
+            if not chunk:
+                break
+            for digest, seq in _RECORD.iter_unpack(chunk):
+                candidates = firsts.get(digest)
+                if candidates is None:
+                    firsts[digest] = [seq]
+                    continue
+                key = self.key(self._items[seq])
+                if any(self.key(self._items[first]) == key for first in candidates):
+                    self._is_duplicate[seq] = 1
+                    self.duplicates += 1
+                else:
+                    candidates.append(seq)
+
+    def finish(self) -> list:
+        """Return the first occurrence of every key, in the original order"""
+        try:
+            if self.spilled:
+                for f in self._partition_files:
+                    self._resolve_partition(f)
+            return [item for item, dup in zip(self._items, self._is_duplicate) if not dup]
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Release the index and delete spill files"""
+        if self._partition_files is not None:
+            for f in self._partition_files:
+                f.close()
+            self._tmpdir.cleanup()
+            self._partition_files = None
+            self._tmpdir = None
+        self._index = {}
+        self._collisions = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,582 @@
+"""
+Pipeline gộp: chạy Bước 0 → Bước 4 trong một process
+- Đọc mỗi file input đúng 1 lần (product info + data của các sheet, trừ material code)
+- Copy data, clean up trên row records trong bộ nhớ (không ghi/đọc lại file StepN)
+- Chỉ xuất file cuối: {input_name}-Step4.xlsx
+- --keep-intermediates: ghi thêm Step1/Step2/Step3 để debug
+  (--intermediate-format tssc: ghi 1 checkpoint nhị phân Step3.tssc thay cho 3 file xlsx;
+  --from-checkpoint chạy Bước 4 từ checkpoint đó và render file Step4)
+- --jobs N: chạy song song N file (process pool), mỗi worker validate + convert 1 file
+- Build tăng dần: file input (SHA-256) và pipeline không đổi thì bỏ qua,
+  dựa trên manifest trong folder output; --force để build lại tất cả
+- --watch: chạy liên tục, convert file mới/thay đổi ngay khi được copy xong vào input
+- Mỗi file thành công/thất bại độc lập; journal trong folder output ghi trạng thái
+  từng file, --resume chỉ chạy lại các file chưa xong của lần chạy trước
+- --mapping FILE.yaml: column mapping cho layout input khác, không cần sửa code
+- Giới hạn RAM (--memory-budget): ước lượng peak memory mỗi file từ kích thước
+  trong zip, file lớn chạy một mình, file nhỏ chạy xen vào chỗ trống
+"""
+
+import argparse
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from batch_journal import (
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_INVALID,
+    STATUS_SKIPPED,
+    STATUS_UNCHANGED,
+    BatchJournal,
+    load_last_run,
+)
+from build_cache import BuildManifest, file_sha256
+from checkpoint import CHECKPOINT_SUFFIX, read_checkpoint, write_checkpoint
+from memory_budget import MB, MemoryBudget, MemoryScheduler, default_memory_limit, estimate_job_memory
+from folder_watch import DEFAULT_POLL_INTERVAL, DEFAULT_SETTLE_SECONDS, FolderWatcher
+from converter import (
+    CleanupStats,
+    build_output_rows,
+    cleanup_rows,
+    collect_product_info,
+    create_output_workbook,
+    render_workbook,
+    write_output_rows,
+)
+from input_reader import parse_input
+from step0_validate import (
+    EXPECTED_HEADERS,
+    HEADER_ROW,
+    ValidationError,
+    ValidationResult,
+    check_header_values,
+    print_validation_result,
+)
+from step2_fill_product_info import fill_product_columns
+from step3_copy_data import COLUMN_MAPPING_ENV, get_column_projection
+
+INPUT_FOLDER = "input"
+OUTPUT_FOLDER = "output"
+INTERMEDIATE_FORMATS = ("xlsx", "tssc")
+CHECKPOINT_STAGE = "Step3"      # Checkpoint chứa row records trước khi clean up
+
+
+@dataclass
+class PipelineResult:
+    """Kết quả chạy pipeline cho một file input"""
+    input_file: Path
+    output_file: Optional[Path] = None
+    product_names: list[str] = field(default_factory=list)
+    article_numbers: list[str] = field(default_factory=list)
+    rows_copied: int = 0
+    rows_written: int = 0
+    stats: CleanupStats = field(default_factory=CleanupStats)
+    intermediates: list[Path] = field(default_factory=list)
+    validation: Optional[ValidationResult] = None
+    skipped: Optional[str] = None   # Lý do bỏ qua file (không có sheet phù hợp)
+    error: Optional[str] = None     # Lỗi dữ liệu (không có product info)
+    failure: Optional[str] = None   # Exception khi xử lý file
+
+    @property
+    def converted(self) -> bool:
+        return self.output_file is not None
+
+    @property
+    def num_products(self) -> int:
+        return max(len(self.product_names), len(self.article_numbers))
+
+    @property
+    def status(self) -> str:
+        """Trạng thái ghi vào journal"""
+        if self.converted:
+            return STATUS_DONE
+        if self.failure or self.error:
+            return STATUS_FAILED
+        if not self.validation.is_valid:
+            return STATUS_INVALID
+        return STATUS_SKIPPED
+
+
+def get_input_files(input_folder: str = INPUT_FOLDER) -> list[Path]:
+    """Lấy tất cả file Excel từ folder input (bỏ qua file tạm ~$)"""
+    input_path = Path(input_folder)
+    files = list(input_path.glob("*.xlsx")) + list(input_path.glob("*.xls"))
+    # Bỏ qua file tạm của Excel (bắt đầu bằng ~$)
+    files = [f for f in files if not f.name.startswith("~$")]
+    if not files:
+        raise FileNotFoundError(f"Không tìm thấy file Excel trong folder {input_folder}")
+    return sorted(files)
+
+
+def save_intermediates(output_folder: Path, input_name: str, product_names, article_numbers, rows) -> list[Path]:
+    """
+    Ghi file Step1/Step2/Step3 (chỉ dùng để debug)
+    - rows: row records trước khi clean up
+    - Dùng chung 1 workbook, lưu lại sau mỗi bước
+    """
+    paths = [output_folder / f"{input_name}-Step{step}.xlsx" for step in (1, 2, 3)]
+    num_products = max(len(product_names), len(article_numbers))
+
+    output_wb = create_output_workbook()
+    output_ws = output_wb.active
+    output_wb.save(paths[0])
+
+    fill_product_columns(output_ws, product_names, article_numbers)
+    output_wb.save(paths[1])
+
+    write_output_rows(output_ws, rows, num_products)
+    output_wb.save(paths[2])
+
+    output_wb.close()
+    return paths
+
+
+def save_checkpoint(output_folder: Path, input_file: Path, product_names, article_numbers, rows) -> list[Path]:
+    """
+    Ghi checkpoint {input_name}-Step3.tssc thay cho các file Step1/Step2/Step3
+    - Chứa product info + row records trước khi clean up
+    - Đọc lại bằng --from-checkpoint để chạy Bước 4
+    """
+    path = output_folder / f"{input_file.stem}-{CHECKPOINT_STAGE}{CHECKPOINT_SUFFIX}"
+    write_checkpoint(path, product_names, article_numbers, rows, stage=CHECKPOINT_STAGE, source=input_file.name)
+    return [path]
+
+
+def finish_rows(result: PipelineResult, output_folder: Path, input_name: str, rows: list[list]) -> PipelineResult:
+    """Bước 4: clean up trên row records, rồi ghi file cuối {input_name}-Step4.xlsx"""
+    rows, result.stats = cleanup_rows(rows)
+    result.rows_written = len(rows)
+
+    result.output_file = output_folder / f"{input_name}-Step4.xlsx"
+    result.output_file.write_bytes(render_workbook(rows, result.product_names, result.article_numbers))
+    return result
+
+
+def process_input_file(input_file: Path,
+                       output_folder: Path,
+                       keep_intermediates: bool = False,
+                       intermediate_format: str = "xlsx") -> PipelineResult:
+    """
+    Chạy Bước 0 → Bước 4 cho một file input
+    - Input được parse 1 lần cho cả validate header và convert
+    - File không hợp lệ thì không convert
+    - Chỉ file Step4 được ghi (trừ khi keep_intermediates)
+    """
+    result = PipelineResult(input_file=input_file)
+    input_name = input_file.stem
+
+    parsed_input = parse_input(
+        input_file,
+        columns=get_column_projection().input_columns,
+        header_row=HEADER_ROW,
+        header_columns=tuple(EXPECTED_HEADERS.keys()),
+    )
+
+    # Bước 0: validate header row của sheet active
+    errors = check_header_values(parsed_input.header_values)
+    result.validation = ValidationResult(file_path=input_file, is_valid=not errors, errors=errors)
+    if errors:
+        return result
+
+    if not parsed_input.sheets:
+        result.skipped = "Không tìm thấy sheet phù hợp"
+        return result
+
+    # Bước 2: product info từ tất cả các sheet
+    result.product_names, result.article_numbers = collect_product_info(parsed_input.sheets)
+    if not result.product_names and not result.article_numbers:
+        result.error = f"File '{input_file.name}' không có Product name và Article number!"
+        return result
+
+    # Bước 3: copy data theo mapping
+    rows = build_output_rows(parsed_input.sheets)
+    result.rows_copied = len(rows)
+
+    if keep_intermediates and intermediate_format == "tssc":
+        result.intermediates = save_checkpoint(
+            output_folder, input_file, result.product_names, result.article_numbers, rows
+        )
+    elif keep_intermediates:
+        result.intermediates = save_intermediates(
+            output_folder, input_name, result.product_names, result.article_numbers, rows
+        )
+
+    # Bước 4: clean up trên row records, rồi ghi file cuối
+    return finish_rows(result, output_folder, input_name, rows)
+
+
+def process_checkpoint_file(checkpoint_file: Path, output_folder: Path) -> PipelineResult:
+    """
+    Chạy Bước 4 từ checkpoint Step3.tssc (không đọc lại file input)
+    - File Step4 được đặt tên theo file input gốc lưu trong checkpoint
+    """
+    checkpoint = read_checkpoint(checkpoint_file)
+    if checkpoint.stage != CHECKPOINT_STAGE:
+        raise ValueError(f"Checkpoint '{checkpoint_file.name}' là {checkpoint.stage!r}, cần {CHECKPOINT_STAGE!r}")
+
+    input_file = Path(checkpoint.source) if checkpoint.source else checkpoint_file
+    result = PipelineResult(input_file=input_file)
+    result.validation = ValidationResult(file_path=input_file, is_valid=True, errors=[])
+    result.product_names = checkpoint.product_names
+    result.article_numbers = checkpoint.article_numbers
+    result.rows_copied = len(checkpoint.rows)
+
+    return finish_rows(result, output_folder, input_file.stem, checkpoint.rows)
+
+
+def run_file(input_file: Path,
+             output_folder: Path,
+             keep_intermediates: bool = False,
+             intermediate_format: str = "xlsx") -> PipelineResult:
+    """
+    Worker của batch mode: xử lý 1 file, không raise exception
+    - Lỗi khi đọc/ghi file được trả về trong result.failure
+    - File .tssc được chạy từ checkpoint (chỉ Bước 4)
+    """
+    try:
+        if input_file.suffix == CHECKPOINT_SUFFIX:
+            return process_checkpoint_file(input_file, output_folder)
+        return process_input_file(input_file, output_folder, keep_intermediates, intermediate_format)
+    except Exception as e:
+        result = PipelineResult(input_file=input_file, failure=f"Error: {str(e)}")
+        result.validation = ValidationResult(
+            file_path=input_file,
+            is_valid=False,
+            errors=[ValidationError(column=0, column_letter="-", expected="Readable Excel file", actual=result.failure)]
+        )
+        return result
+
+
+def _init_worker() -> None:
+    """Worker bỏ qua Ctrl+C, process chính tự dừng pool"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def iter_results(input_files: list[Path],
+                 output_folder: Path,
+                 keep_intermediates: bool,
+                 jobs: int,
+                 memory_limit: int,
+                 intermediate_format: str = "xlsx"):
+    """
+    Chạy pipeline cho từng file, trả kết quả theo đúng thứ tự input_files
+    - jobs > 1: chạy trên process pool, chỉ start file khi ước lượng RAM còn vừa
+      memory_limit; file chưa bắt đầu bị hủy nếu dừng sớm
+    """
+    if jobs <= 1 or len(input_files) <= 1:
+        for input_file in input_files:
+            yield run_file(input_file, output_folder, keep_intermediates, intermediate_format)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=min(jobs, len(input_files)), initializer=_init_worker)
+    scheduler = MemoryScheduler(executor, max_workers=jobs, budget=MemoryBudget(memory_limit))
+    for idx, input_file in enumerate(input_files):
+        estimate = estimate_job_memory(input_file).peak_bytes
+        scheduler.add(idx, estimate, run_file, input_file, output_folder, keep_intermediates, intermediate_format)
+
+    # Kết quả xong trước được giữ lại cho đến khi tới lượt (output theo thứ tự input)
+    finished = {}
+    next_idx = 0
+    try:
+        while scheduler.has_work:
+            for idx, future in scheduler.wait():
+                finished[idx] = future.result()
+            while next_idx in finished:
+                yield finished.pop(next_idx)
+                next_idx += 1
+    finally:
+        scheduler.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def print_result(result: PipelineResult) -> None:
+    """In kết quả của một file (giống output của các bước CLI)"""
+    print(f"  {result.input_file.name} → {result.output_file.name}")
+    for path in result.intermediates:
+        print(f"    (debug) {path.name}")
+    if result.product_names and result.article_numbers:
+        print(f"    Tìm thấy {result.num_products} products: {', '.join(map(str, result.article_numbers))}")
+    elif result.product_names:
+        print(f"    Tìm thấy {len(result.product_names)} product names (không có article numbers)")
+    else:
+        print(f"    Tìm thấy {len(result.article_numbers)} article numbers (không có product names)")
+    print(f"    Copied {result.rows_copied} rows, {result.num_products} products marked with X")
+    print(f"    - Cleared K: {result.stats.k_cleared} rows")
+    print(f"    - Art filled: {result.stats.art_filled} rows")
+    print(f"    - Q cleared: {result.stats.q_cleared} cells")
+    print(f"    - Duplicates removed: {result.stats.duplicates_removed} rows")
+
+
+def report_result(result: PipelineResult) -> None:
+    """In kết quả của một file"""
+    if result.failure:
+        print(f"  ✗ {result.input_file.name} - {result.failure}")
+    elif not result.validation.is_valid:
+        print_validation_result(result.validation)
+    elif result.skipped:
+        print(f"  ⚠ Bỏ qua {result.input_file.name}: {result.skipped}")
+    elif result.error:
+        # Thiếu CẢ product name VÀ article number: file này lỗi, các file khác vẫn chạy
+        print(f"  ❌ LỖI: {result.error}")
+        print(f"     Vui lòng kiểm tra lại file input và đảm bảo có ít nhất 1 trong 2 thông tin.")
+    else:
+        print_result(result)
+
+
+def print_summary(results: list[PipelineResult], total: int, unchanged: int = 0) -> None:
+    """In tổng kết batch: số file convert được, không đổi, không hợp lệ, bị bỏ qua, bị lỗi"""
+    converted = sum(1 for r in results if r.converted)
+    invalid = sum(1 for r in results if not r.failure and not r.validation.is_valid)
+    skipped = sum(1 for r in results if r.skipped)
+    failed = sum(1 for r in results if r.failure or r.error)
+    not_run = total - len(results)
+
+    print()
+    print("-" * 60)
+    print(f"Tổng kết: {converted}/{total} file đã convert")
+    if unchanged:
+        print(f"  ↷ {unchanged} file không thay đổi (dùng lại output cũ)")
+    if invalid:
+        print(f"  ✗ {invalid} file sai format header (row {HEADER_ROW})")
+    if skipped:
+        print(f"  ⚠ {skipped} file bị bỏ qua")
+    if failed:
+        print(f"  ✗ {failed} file bị lỗi:")
+        for r in results:
+            if r.failure or r.error:
+                print(f"      {r.input_file.name}: {r.failure or r.error}")
+    if not_run:
+        print(f"  ⛔ {not_run} file chưa chạy (dùng --resume để chạy tiếp)")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Chạy Bước 0 → Bước 4 (validate + convert) cho các file input")
+    parser.add_argument("--input", default=INPUT_FOLDER, help="Folder chứa file input")
+    parser.add_argument("--output", default=OUTPUT_FOLDER, help="Folder xuất file Step4")
+    parser.add_argument("--keep-intermediates", action="store_true",
+                        help="Ghi thêm file Step1/Step2/Step3 (debug)")
+    parser.add_argument("--intermediate-format", choices=INTERMEDIATE_FORMATS, default="xlsx",
+                        help="Format file trung gian của --keep-intermediates: xlsx (Step1/2/3) "
+                             "hoặc tssc (1 checkpoint nhị phân Step3, ghi/đọc nhanh hơn)")
+    parser.add_argument("--from-checkpoint", nargs="+", metavar="PATH",
+                        help="Chạy Bước 4 từ checkpoint .tssc (file hoặc folder) thay vì từ folder input")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Số process chạy song song (0 = số CPU)")
+    parser.add_argument("--force", action="store_true",
+                        help="Build lại tất cả file, bỏ qua manifest")
+    parser.add_argument("--resume", action="store_true",
+                        help="Chạy tiếp lần chạy trước: chỉ chạy lại các file chưa xong/bị lỗi")
+    parser.add_argument("--memory-budget", type=float, default=default_memory_limit() / MB,
+                        help="RAM (MB) cho các file chạy song song; mặc định $TSS_MEMORY_BUDGET_MB "
+                             "hoặc 1/2 RAM máy")
+    parser.add_argument("--mapping", metavar="YAML",
+                        help="File YAML column mapping cho layout input khác (mặc định $TSS_COLUMN_MAPPING "
+                             "hoặc mapping TALIMEX)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Chạy liên tục: theo dõi folder input và convert file mới/thay đổi")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="Watch mode: số giây giữa 2 lần quét folder input")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE_SECONDS,
+                        help="Watch mode: số giây file phải không đổi size/mtime trước khi convert")
+    return parser.parse_args(argv)
+
+
+def watch(args, output_folder: Path, jobs: int) -> int:
+    """
+    Watch mode: quét folder input liên tục, convert file ngay khi sẵn sàng
+    - File đang được copy / đang mở trong Excel (~$) được chờ đến khi ổn định
+    - File không đổi so với manifest thì bỏ qua (trừ khi --force)
+    - Lỗi của một file không dừng watch mode; Ctrl+C để thoát
+    """
+    watcher = FolderWatcher(args.input, settle_seconds=args.settle)
+    manifest = BuildManifest.load(output_folder)
+    executor = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker)
+    scheduler = MemoryScheduler(executor, max_workers=jobs, budget=MemoryBudget(args.memory_budget * MB))
+    active = set()  # Tên file đang chờ hoặc đang convert
+
+    print(f"Đang theo dõi folder {args.input} ({jobs} process, Ctrl+C để dừng)")
+
+    try:
+        while True:
+            for input_file in watcher.poll():
+                if input_file.name in active:
+                    # Đang convert bản cũ: chờ xong rồi quét lại
+                    watcher.forget(input_file)
+                    continue
+                digest = file_sha256(input_file)
+                if not args.force and not args.keep_intermediates and manifest.is_up_to_date(input_file.name, digest):
+                    continue
+                print(f"  → {input_file.name}")
+                estimate = estimate_job_memory(input_file).peak_bytes
+                scheduler.add((input_file, digest), estimate, run_file, input_file, output_folder,
+                              args.keep_intermediates, args.intermediate_format)
+                active.add(input_file.name)
+
+            if not scheduler.has_work:
+                time.sleep(args.interval)
+                continue
+
+            for (input_file, digest), future in scheduler.wait(timeout=args.interval):
+                active.discard(input_file.name)
+                result = future.result()
+                if result.converted:
+                    manifest.record(input_file.name, digest, result.output_file)
+                else:
+                    manifest.discard(input_file.name)
+                manifest.save()
+                report_result(result)
+
+    except KeyboardInterrupt:
+        print(f"\nĐang dừng watch mode...")
+    finally:
+        scheduler.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+        manifest.save()
+
+    return 0
+
+
+def get_checkpoint_files(paths: list[str]) -> list[Path]:
+    """Lấy các file checkpoint .tssc từ danh sách file/folder"""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(path.glob(f"*{CHECKPOINT_SUFFIX}")))
+        else:
+            files.append(path)
+    if not files:
+        raise FileNotFoundError(f"Không tìm thấy file checkpoint {CHECKPOINT_SUFFIX} trong {', '.join(paths)}")
+    return files
+
+
+def render_checkpoints(args, output_folder: Path, jobs: int) -> int:
+    """
+    --from-checkpoint: chạy Bước 4 (clean up + render Step4.xlsx) cho các checkpoint
+    - Không dùng manifest/journal (chỉ áp dụng cho file input)
+    """
+    try:
+        checkpoint_files = get_checkpoint_files(args.from_checkpoint)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
+
+    print(f"Tìm thấy {len(checkpoint_files)} checkpoint")
+    results = []
+    try:
+        for result in iter_results(checkpoint_files, output_folder, False, jobs, int(args.memory_budget * MB)):
+            results.append(result)
+            report_result(result)
+    except KeyboardInterrupt:
+        print(f"\n⛔ Đã dừng.")
+        return 130
+
+    print_summary(results, len(checkpoint_files))
+    if any(r.status == STATUS_FAILED for r in results):
+        return 1
+    print(f"\nHoàn thành!")
+    return 0
+
+
+def main(argv=None) -> int:
+    """
+    Main function
+    Returns:
+        0 nếu tất cả file được xử lý
+        1 nếu không có file input hoặc có file lỗi / không hợp lệ
+    """
+    args = parse_args(argv)
+
+    output_folder = Path(args.output)
+    output_folder.mkdir(parents=True, exist_ok=True)
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    # Worker process đọc mapping từ biến môi trường (kế thừa từ process chính)
+    if args.mapping:
+        os.environ[COLUMN_MAPPING_ENV] = str(Path(args.mapping).resolve())
+
+    if args.watch:
+        return watch(args, output_folder, jobs)
+    if args.from_checkpoint:
+        return render_checkpoints(args, output_folder, jobs)
+
+    try:
+        input_files = get_input_files(args.input)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
+
+    print(f"Tìm thấy {len(input_files)} file trong folder {args.input}")
+
+    # --resume: chỉ các file chưa xong của lần chạy trước (theo journal)
+    last_run = load_last_run(output_folder) if args.resume else None
+    if args.resume and last_run is None:
+        print(f"  ⚠ Không có journal của lần chạy trước, chạy toàn bộ")
+    force = args.force or (last_run is not None and last_run.force)
+
+    if last_run is not None:
+        incomplete = set(last_run.incomplete_files)
+        input_files = [f for f in input_files if f.name in incomplete]
+        print(f"  ↻ Chạy tiếp: {len(input_files)} file chưa xong "
+              f"({len(last_run.files) - len(incomplete)}/{len(last_run.files)} file đã xong)")
+        journal = BatchJournal.resume(last_run, output_folder)
+    else:
+        journal = BatchJournal.start(output_folder, [f.name for f in input_files], force=force)
+
+    # Build tăng dần: chỉ chạy file có input hoặc pipeline thay đổi
+    # (--keep-intermediates luôn build lại vì file StepN không có trong manifest)
+    manifest = BuildManifest.load(output_folder)
+    input_hashes = {f.name: file_sha256(f) for f in input_files}
+    if force or args.keep_intermediates:
+        pending_files = input_files
+    else:
+        pending_files = [f for f in input_files if not manifest.is_up_to_date(f.name, input_hashes[f.name])]
+    unchanged = len(input_files) - len(pending_files)
+    if unchanged:
+        print(f"  ↷ {unchanged} file không thay đổi, bỏ qua")
+        pending_names = {f.name for f in pending_files}
+        for input_file in input_files:
+            if input_file.name not in pending_names:
+                journal.record(input_file.name, STATUS_UNCHANGED, sha256=input_hashes[input_file.name])
+
+    if jobs > 1 and len(pending_files) > 1:
+        print(f"Chạy song song với {jobs} process")
+
+    results = []
+    try:
+        for result in iter_results(pending_files, output_folder, args.keep_intermediates, jobs,
+                                   int(args.memory_budget * MB), args.intermediate_format):
+            results.append(result)
+            name = result.input_file.name
+            if result.converted:
+                manifest.record(name, input_hashes[name], result.output_file)
+            else:
+                manifest.discard(name)
+            journal.record(name, result.status, error=result.failure or result.error, sha256=input_hashes[name])
+
+            report_result(result)
+        journal.finish()
+    except KeyboardInterrupt:
+        print(f"\n⛔ Đã dừng. Chạy lại với --resume để tiếp tục các file chưa xong.")
+        return 130
+    finally:
+        # Lưu cả khi bị dừng giữa chừng để lần chạy sau không build lại file đã xong
+        manifest.save()
+        journal.close()
+
+    print_summary(results, len(pending_files), unchanged)
+
+    if any(r.status == STATUS_FAILED or r.status == STATUS_INVALID for r in results):
+        return 1
+    print(f"\nHoàn thành!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
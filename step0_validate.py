@@ -3,12 +3,18 @@ Bước 0: Validate format file input trước khi chạy pipeline
 - Kiểm tra header row (row 9) có đúng thứ tự các cột không
 - Báo lỗi chi tiết nếu format không đúng
 - Chỉ cho phép tiếp tục pipeline nếu tất cả file input hợp lệ
+- Chỉ đọc row 9 của sheet active (probe trực tiếp XML trong file xlsx),
+  validate nhiều file song song (--jobs)
 """
 
+import argparse
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from openpyxl import load_workbook
 from dataclasses import dataclass
+from input_reader import DEFAULT_ENGINE, READER_ENGINES, read_header_values
 
 
 INPUT_FOLDER = "input"
@@ -68,32 +74,42 @@ def get_input_files() -> list[Path]:
     return sorted(files)
 
 
-def validate_file(file_path: Path) -> ValidationResult:
+def check_header_values(header_values: dict) -> list[ValidationError]:
     """
-    Validate một file Excel
-    - Kiểm tra header row có đúng format không
+    So sánh giá trị header row (column index -> value) với EXPECTED_HEADERS
     - So sánh case-insensitive, partial match
     """
     errors = []
 
-    try:
-        wb = load_workbook(file_path, read_only=True, data_only=True)
-        ws = wb.active
+    for col_idx, expected_text in EXPECTED_HEADERS.items():
+        cell_value = header_values.get(col_idx)
+        actual_text = str(cell_value).strip() if cell_value else ""
+
+        # Partial match, case-insensitive
+        if expected_text.lower() not in actual_text.lower():
+            errors.append(ValidationError(
+                column=col_idx,
+                column_letter=get_column_letter(col_idx),
+                expected=expected_text,
+                actual=actual_text if actual_text else "(empty)"
+            ))
+
+    return errors
 
-        for col_idx, expected_text in EXPECTED_HEADERS.items():
-            cell_value = ws.cell(row=HEADER_ROW, column=col_idx).value
-            actual_text = str(cell_value).strip() if cell_value else ""
 
-            # Partial match, case-insensitive
-            if expected_text.lower() not in actual_text.lower():
-                errors.append(ValidationError(
-                    column=col_idx,
-                    column_letter=get_column_letter(col_idx),
-                    expected=expected_text,
-                    actual=actual_text if actual_text else "(empty)"
-                ))
+def validate_file(file_path: Path, engine: str = DEFAULT_ENGINE) -> ValidationResult:
+    """
+    Validate một file Excel
+    - Kiểm tra header row có đúng format không
+    - So sánh case-insensitive, partial match
+    - Chỉ đọc header row của sheet active, dừng parse sau row 9
+      (engine 'auto': probe XML, fallback openpyxl nếu cần)
+    """
+    errors = []
 
-        wb.close()
+    try:
+        header_values = read_header_values(file_path, HEADER_ROW, EXPECTED_HEADERS.keys(), engine=engine)
+        errors = check_header_values(header_values)
 
     except Exception as e:
         errors.append(ValidationError(
@@ -121,13 +137,38 @@ def print_validation_result(result: ValidationResult) -> None:
                   f"expected '{error.expected}', got '{error.actual}'")
 
 
-def main() -> int:
+def validate_files(input_files: list[Path], jobs: int = 1, engine: str = DEFAULT_ENGINE) -> list[ValidationResult]:
+    """
+    Validate nhiều file, song song trên process pool nếu jobs > 1
+    - Kết quả giữ đúng thứ tự input_files
+    """
+    validate = partial(validate_file, engine=engine)
+    if jobs <= 1 or len(input_files) <= 1:
+        return [validate(f) for f in input_files]
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(input_files))) as executor:
+        return list(executor.map(validate, input_files, chunksize=8))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Validate header row của các file input")
+    parser.add_argument("--jobs", "-j", type=int, default=0,
+                        help="Số process validate song song (0 = số CPU, 1 = tuần tự)")
+    parser.add_argument("--engine", choices=["auto", *READER_ENGINES], default=DEFAULT_ENGINE,
+                        help="Cách đọc header: auto (probe XML, fallback openpyxl), xml, openpyxl")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
     """
     Main function
     Returns:
         0 if all files valid
         1 if any file invalid
     """
+    args = parse_args(argv)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
     print("=" * 60)
     print("Step 0: Validating input file format")
     print("=" * 60)
@@ -141,7 +182,7 @@ def main() -> int:
     print(f"\nFound {len(input_files)} file(s) in '{INPUT_FOLDER}/' folder")
     print(f"Checking header row {HEADER_ROW}...\n")
 
-    results = [validate_file(f) for f in input_files]
+    results = validate_files(input_files, jobs=jobs, engine=args.engine)
 
     valid_count = sum(1 for r in results if r.is_valid)
     invalid_count = len(results) - valid_count
@@ -7,7 +7,16 @@ Bước 2: Điền thông tin Product Name và Article Number
 
 from pathlib import Path
 from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+from streamlit_ui_toolkit.templates import get_tss_style_registry
+from streamlit_ui_toolkit.templates.presets import ARTICLE_STYLE, PRODUCT_FILL_STYLE, PRODUCT_NAME_STYLE
+from input_reader import (
+    PRODUCT_INFO_ROWS,
+    PRODUCT_INFO_SCAN_COLUMNS,
+    find_product_info,
+    is_not_material_code,
+    load_sheets,
+)
 
 INPUT_FOLDER = "input"
 OUTPUT_FOLDER = "output"
@@ -27,43 +36,6 @@ def get_input_files() -> list[Path]:
     return files
 
 
-def get_sheets_except_material_code(wb):
-    """Lấy tất cả sheet trừ 'material code' (case insensitive)"""
-    sheets = []
-    for sheet_name in wb.sheetnames:
-        if sheet_name.lower() != "material code":
-            sheets.append(wb[sheet_name])
-    return sheets
-
-
-def find_product_info(ws):
-    """Tìm Product name và Article number trong 3 row đầu"""
-    product_names = []
-    article_numbers = []
-
-    for row in range(1, 4):  # Row 1-3
-        for col in range(1, min(ws.max_column + 1, 20)):  # Giới hạn cột tìm kiếm
-            cell_value = ws.cell(row=row, column=col).value
-            if cell_value:
-                cell_str = str(cell_value).lower().strip()
-                if "product name" in cell_str:
-                    # Tìm giá trị trong các cột tiếp theo (offset 1-3)
-                    for offset in range(1, 4):
-                        value = ws.cell(row=row, column=col + offset).value
-                        if value:
-                            product_names = [p.strip() for p in str(value).split('\n') if p.strip()]
-                            break
-                elif "article number" in cell_str:
-                    # Tìm giá trị trong các cột tiếp theo (offset 1-3)
-                    for offset in range(1, 4):
-                        value = ws.cell(row=row, column=col + offset).value
-                        if value:
-                            article_numbers = [str(a).strip() for a in str(value).split('\n') if str(a).strip()]
-                            break
-
-    return product_names, article_numbers
-
-
 def fill_product_columns(ws, product_names, article_numbers):
     """Điền product info vào columns R onwards"""
     start_col = 18  # Column R = 18
@@ -71,47 +43,27 @@ def fill_product_columns(ws, product_names, article_numbers):
     # Số cột = max của 2 danh sách
     num_products = max(len(product_names), len(article_numbers))
 
-    # Style cho header
-    header_font = Font(bold=False)
-    header_alignment = Alignment(
-        textRotation=90,
-        vertical='center',
-        horizontal='center',
-        wrap_text=True
-    )
-    article_alignment = Alignment(
-        vertical='center',
-        horizontal='center'
-    )
-
-    # Background màu peach/salmon (ARGB format)
-    peach_fill = PatternFill(start_color="FFFCD5B4", end_color="FFFCD5B4", fill_type="solid")
+    # Style dùng chung (tạo 1 lần mỗi process), gán cho cell qua style id
+    styles = get_tss_style_registry().bind(ws.parent)
 
     for i in range(num_products):
         col = start_col + i
-        col_letter = ws.cell(row=1, column=col).column_letter
+        col_letter = get_column_letter(col)
 
         # Lấy giá trị (có thể None nếu danh sách ngắn hơn)
         name = product_names[i] if i < len(product_names) else ""
         article = article_numbers[i] if i < len(article_numbers) else ""
 
         # Article number ở row 10
-        article_cell = ws.cell(row=10, column=col, value=article)
-        article_cell.alignment = article_alignment
-        article_cell.font = header_font
-        article_cell.fill = peach_fill
+        styles.apply(ws.cell(row=10, column=col, value=article), ARTICLE_STYLE)
 
         # Product name: merge row 1 đến row 9, xoay 90 độ
         ws.merge_cells(start_row=1, start_column=col, end_row=9, end_column=col)
-        name_cell = ws.cell(row=1, column=col, value=name)
-        name_cell.alignment = header_alignment
-        name_cell.font = header_font
-        name_cell.fill = peach_fill
+        styles.apply(ws.cell(row=1, column=col, value=name), PRODUCT_NAME_STYLE)
 
-        # Apply fill cho tất cả cells trong merged range (rows 1-9)
-        for row in range(1, 10):
-            cell = ws.cell(row=row, column=col)
-            cell.fill = peach_fill
+        # Fill cho các cell còn lại trong merged range (rows 2-9)
+        for row in range(2, 10):
+            styles.apply(ws.cell(row=row, column=col), PRODUCT_FILL_STYLE)
 
         # Tự động tính width dựa trên độ dài article number
         article_len = len(str(article)) if article else 0
@@ -124,6 +76,8 @@ def main():
 
     print(f"Tìm thấy {len(input_files)} file trong folder input")
 
+    failed_files = []
+
     for input_file in input_files:
         input_name = input_file.stem
         step1_file = Path(OUTPUT_FOLDER) / f"{input_name}-Step1.xlsx"
@@ -132,9 +86,14 @@ def main():
             print(f"  ⚠ Bỏ qua {input_file.name}: Chưa có file Step1")
             continue
 
-        # Đọc file input
-        input_wb = load_workbook(input_file)
-        input_sheets = get_sheets_except_material_code(input_wb)
+        # Đọc file input: chỉ row 1-3 của các sheet (trừ material code),
+        # sheet material code không bị parse
+        input_sheets = load_sheets(
+            input_file,
+            columns=PRODUCT_INFO_SCAN_COLUMNS,
+            rows=(1, PRODUCT_INFO_ROWS),
+            sheet_predicate=is_not_material_code,
+        )
 
         if not input_sheets:
             print(f"  ⚠ Bỏ qua {input_file.name}: Không tìm thấy sheet phù hợp")
@@ -144,19 +103,20 @@ def main():
         all_product_names = []
         all_article_numbers = []
 
-        for input_ws in input_sheets:
-            product_names, article_numbers = find_product_info(input_ws)
+        for sheet_rows in input_sheets.values():
+            product_names, article_numbers = find_product_info([values for _, values in sheet_rows])
             if product_names:
                 all_product_names.extend(product_names)
             if article_numbers:
                 all_article_numbers.extend(article_numbers)
 
-        # Kiểm tra: nếu không tìm thấy CẢ product name VÀ article number thì báo lỗi và dừng
+        # Kiểm tra: nếu không tìm thấy CẢ product name VÀ article number thì báo lỗi,
+        # bỏ qua file này (không tạo Step2) và tiếp tục các file khác
         if not all_product_names and not all_article_numbers:
-            print(f"\n❌ LỖI: File '{input_file.name}' không có Product name và Article number!")
-            print(f"   Vui lòng kiểm tra lại file input và đảm bảo có ít nhất 1 trong 2 thông tin.")
-            print(f"\n⛔ Workflow đã dừng.")
-            return  # Dừng workflow
+            print(f"  ❌ LỖI: File '{input_file.name}' không có Product name và Article number!")
+            print(f"     Vui lòng kiểm tra lại file input và đảm bảo có ít nhất 1 trong 2 thông tin.")
+            failed_files.append(input_file.name)
+            continue
 
         # Mở file Step1
         output_wb = load_workbook(step1_file)
@@ -178,6 +138,9 @@ def main():
         elif all_article_numbers:
             print(f"    Tìm thấy {len(all_article_numbers)} article numbers (không có product names)")
 
+    if failed_files:
+        print(f"\n⚠ {len(failed_files)} file bị lỗi (không tạo Step2): {', '.join(failed_files)}")
+
     print(f"\nHoàn thành!")
 
 
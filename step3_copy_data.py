@@ -6,28 +6,41 @@ Bước 3: Copy dữ liệu từ Input và điền X cho Products
 - Xuất file: {input_name}-Step3.xlsx
 """
 
+import os
+from functools import lru_cache
 from pathlib import Path
 from openpyxl import load_workbook
-from openpyxl.styles import Alignment
+from streamlit_ui_toolkit.templates import (
+    ColumnMapping,
+    ColumnProjection,
+    compile_mapping,
+    get_tss_column_mapping,
+    get_tss_style_registry,
+)
+from streamlit_ui_toolkit.templates.presets import MARK_STYLE
+from input_reader import DATA_START_ROW, is_not_material_code, load_sheets
 
 INPUT_FOLDER = "input"
 OUTPUT_FOLDER = "output"
 
-# Column mapping: Input column -> Output column
-COLUMN_MAPPING = {
-    2: 17,  # B -> Q
-    4: 2,   # D -> B
-    5: 3,   # E -> C
-    6: 4,   # F -> D
-    7: 5,   # G -> E
-    8: 6,   # H -> F
-    9: 7,   # I -> G
-    10: 8,  # J -> H
-    11: 9,  # K -> I
-    12: 10, # L -> J
-    14: 11, # N -> K
-    15: 12, # O -> L
-}
+# Column mapping (Input column -> Output column): mặc định mapping TALIMEX,
+# layout khác: đặt $TSS_COLUMN_MAPPING = đường dẫn file YAML (xem ColumnMapping.from_yaml)
+COLUMN_MAPPING_ENV = "TSS_COLUMN_MAPPING"
+
+
+@lru_cache(maxsize=None)
+def get_column_mapping() -> ColumnMapping:
+    """Column mapping đang dùng: file YAML trong $TSS_COLUMN_MAPPING, mặc định mapping TALIMEX"""
+    path = os.environ.get(COLUMN_MAPPING_ENV)
+    if path:
+        return ColumnMapping.from_yaml(path)
+    return get_tss_column_mapping()
+
+
+@lru_cache(maxsize=None)
+def get_column_projection() -> ColumnProjection:
+    """Column mapping đã compile: đọc input_columns, project() ra row record A-Q"""
+    return compile_mapping(get_column_mapping())
 
 
 def get_input_files() -> list[Path]:
@@ -43,37 +56,27 @@ def get_input_files() -> list[Path]:
     return files
 
 
-def get_sheets_except_material_code(wb):
-    """Lấy tất cả sheet trừ 'material code' (case insensitive)"""
-    sheets = []
-    for sheet_name in wb.sheetnames:
-        if sheet_name.lower() != "material code":
-            sheets.append(wb[sheet_name])
-    return sheets
-
-
-def copy_data(input_ws, output_ws):
-    """Copy data từ input sang output theo mapping"""
-    data_start_row = 10  # Data bắt đầu từ row 10 trong input
+def copy_data(data_rows, output_ws):
+    """
+    Copy data từ input sang output theo mapping
+    - data_rows: list các tuple giá trị theo thứ tự input_columns của column mapping
+    - Check row trống và sắp xếp lại cột trong một bước (ColumnProjection.project)
+    """
     output_start_row = 11  # Output bắt đầu từ row 11
+    project = get_column_projection().project
 
     row_count = 0
-    for input_row in range(data_start_row, input_ws.max_row + 1):
-        # Kiểm tra row có data không (check cột đầu tiên trong mapping)
-        has_data = False
-        for input_col in COLUMN_MAPPING.keys():
-            if input_ws.cell(row=input_row, column=input_col).value:
-                has_data = True
-                break
-
-        if not has_data:
+    for values in data_rows:
+        # Bỏ qua row không có data ở tất cả các cột trong mapping
+        record = project(values)
+        if record is None:
             continue
 
         output_row = output_start_row + row_count
 
-        for input_col, output_col in COLUMN_MAPPING.items():
-            value = input_ws.cell(row=input_row, column=input_col).value
-            output_ws.cell(row=output_row, column=output_col, value=value)
+        for output_col, value in enumerate(record, 1):
+            if value is not None:
+                output_ws.cell(row=output_row, column=output_col, value=value)
 
         row_count += 1
 
@@ -95,13 +98,13 @@ def fill_product_marks(output_ws, num_products, data_rows):
     start_col = 18  # Column R = 18
     start_row = 11
 
-    center_alignment = Alignment(horizontal='center', vertical='center')
+    # Style dùng chung (tạo 1 lần mỗi process), gán cho cell qua style id
+    styles = get_tss_style_registry().bind(output_ws.parent)
 
     for row in range(start_row, start_row + data_rows):
         for i in range(num_products):
             col = start_col + i
-            cell = output_ws.cell(row=row, column=col, value="X")
-            cell.alignment = center_alignment
+            styles.apply(output_ws.cell(row=row, column=col, value="X"), MARK_STYLE)
 
 
 def main():
@@ -117,9 +120,14 @@ def main():
             print(f"  ⚠ Bỏ qua {input_file.name}: Chưa có file Step2")
             continue
 
-        # Đọc file input
-        input_wb = load_workbook(input_file)
-        input_sheets = get_sheets_except_material_code(input_wb)
+        # Đọc file input: chỉ các cột trong mapping từ row 10 trở đi,
+        # sheet material code không bị parse
+        input_sheets = load_sheets(
+            input_file,
+            columns=get_column_projection().input_columns,
+            rows=(DATA_START_ROW, None),
+            sheet_predicate=is_not_material_code,
+        )
 
         if not input_sheets:
             print(f"  ⚠ Bỏ qua {input_file.name}: Không tìm thấy sheet phù hợp")
@@ -131,8 +139,8 @@ def main():
 
         # Copy data từ tất cả sheets (trừ material code)
         total_rows = 0
-        for input_ws in input_sheets:
-            rows_copied = copy_data(input_ws, output_ws)
+        for sheet_rows in input_sheets.values():
+            rows_copied = copy_data([values for _, values in sheet_rows], output_ws)
             total_rows += rows_copied
 
         # Đếm số products và điền X
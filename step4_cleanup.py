@@ -4,11 +4,15 @@ Bước 4: Clean up dữ liệu
 - Điền "Art" vào A nếu Q chứa "Article"
 - Xóa nội dung cột Q
 - Loại bỏ dòng trùng lặp (A-Q)
+- Các rule khai báo trong cleanup_rules.TSS_CLEANUP_RULES, chạy trong một lượt duyệt
 - Xuất file: {input_name}-Step4.xlsx
 """
 
 from pathlib import Path
 from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+from cleanup_rules import get_tss_cleanup_rules
+from row_dedup import DEFAULT_MEMORY_BUDGET, RowDeduplicator
 
 OUTPUT_FOLDER = "output"
 DATA_START_ROW = 11  # Data bắt đầu từ row 11
@@ -26,73 +30,68 @@ def get_step3_files() -> list[Path]:
     return files
 
 
-def clear_k_if_not_test_report(ws):
+def compact_rows(ws, kept_rows: list[int], max_row: int, max_col: int) -> None:
     """
-    Nếu H không phải 'Test Report' hoặc 'TR' (case insensitive)
-    thì clear nội dung cột K ở dòng đó
+    Dời các dòng giữ lại lên liên tiếp từ DATA_START_ROW, xóa phần đuôi
+    - Mỗi đoạn dòng giữ lại liên tiếp được dời lên bằng một lần ws.move_range
+      (giá trị + style, gồm cả các cột product)
+    - Phần đuôi (chỉ còn các dòng trùng) bị xóa bằng một lần delete_rows
+      (tuyến tính theo số dòng x cột)
     """
-    count = 0
-    for row in range(DATA_START_ROW, ws.max_row + 1):
-        h_val = ws.cell(row=row, column=8).value  # Column H = 8
-        if h_val:
-            h_lower = str(h_val).lower().strip()
-            if h_lower not in ('test report', 'tr'):
-                ws.cell(row=row, column=11).value = None  # Column K = 11
-                count += 1
-    return count
-
-
-def fill_art_if_article_in_q(ws):
+    last_col = get_column_letter(max_col)
+    target_row = DATA_START_ROW
+    run_start = None
+    for i, row in enumerate(kept_rows):
+        if run_start is None:
+            run_start = row
+        # Hết đoạn liên tiếp: dời cả đoạn lên target_row
+        if i + 1 == len(kept_rows) or kept_rows[i + 1] != row + 1:
+            offset = target_row - run_start
+            if offset:
+                ws.move_range(f"A{run_start}:{last_col}{row}", rows=offset)
+            target_row += row - run_start + 1
+            run_start = None
+
+    if target_row <= max_row:
+        ws.delete_rows(target_row, max_row - target_row + 1)
+
+
+def cleanup_worksheet(ws, memory_budget=DEFAULT_MEMORY_BUDGET) -> dict[str, int]:
     """
-    Nếu Q chứa 'Article' hoặc 'Art' (case insensitive)
-    thì điền 'Art' vào cột A ở hàng đó
+    Clean up sheet Step3 trong MỘT lượt duyệt các dòng
+    - Mỗi dòng: áp dụng tất cả rule của TSS_CLEANUP_RULES bằng hàm gộp
+      (Clear K nếu H không phải Test report/TR, điền Art vào A nếu Q chứa
+      Article, xóa Q), ghi lại các ô bị đổi, rồi đưa vào RowDeduplicator
+    - Loại bỏ dòng trùng A-Q (giữ dòng đầu tiên): check trùng bằng fingerprint
+      128-bit, spill ra file tạm khi vượt memory_budget
+    Returns:
+        Số lần áp dụng của từng rule + 'duplicates_removed'
     """
-    count = 0
-    for row in range(DATA_START_ROW, ws.max_row + 1):
-        q_val = ws.cell(row=row, column=17).value  # Column Q = 17
-        if q_val:
-            q_lower = str(q_val).lower()
-            if 'article' in q_lower or 'art' in q_lower:
-                ws.cell(row=row, column=1).value = "Art"  # Column A = 1
-                count += 1
-    return count
-
-
-def clear_column_q(ws):
-    """Xóa toàn bộ nội dung cột Q từ DATA_START_ROW"""
-    count = 0
-    for row in range(DATA_START_ROW, ws.max_row + 1):
-        if ws.cell(row=row, column=17).value:
-            ws.cell(row=row, column=17).value = None
-            count += 1
-    return count
-
-
-def remove_duplicate_rows(ws):
-    """
-    Loại bỏ các dòng có nội dung trùng từ cột A đến Q
-    Giữ dòng đầu tiên, xóa các dòng trùng sau
-    """
-    seen = set()
-    rows_to_delete = []
+    rules = get_tss_cleanup_rules()
+    apply_rules = rules.apply
+    counts = rules.new_counts()
+    max_row = ws.max_row
+    max_col = max(ws.max_column, 17)
 
-    for row in range(DATA_START_ROW, ws.max_row + 1):
-        # Tạo tuple từ giá trị A-Q để check trùng
-        row_key = tuple(
-            ws.cell(row=row, column=col).value
-            for col in range(1, 18)  # A=1 to Q=17
-        )
+    def row_key(row):
+        # Tuple giá trị A-Q để check trùng
+        return tuple(ws.cell(row=row, column=col).value for col in range(1, 18))  # A=1 to Q=17
 
-        if row_key in seen:
-            rows_to_delete.append(row)
-        else:
-            seen.add(row_key)
+    dedup = RowDeduplicator(key=row_key, memory_budget=memory_budget)
+    for row, cells in enumerate(ws.iter_rows(min_row=DATA_START_ROW, max_row=max_row, max_col=17), DATA_START_ROW):
+        values = [cell.value for cell in cells]
+        apply_rules(values, counts)
+        for cell, value in zip(cells, values):
+            if cell.value is not value:
+                cell.value = value
+        dedup.add(row)
+    kept_rows = dedup.finish()
 
-    # Xóa từ dưới lên để không ảnh hưởng index
-    for row in reversed(rows_to_delete):
-        ws.delete_rows(row)
+    compact_rows(ws, kept_rows, max_row, max_col)
 
-    return len(rows_to_delete)
+    hits = rules.hits(counts)
+    hits["duplicates_removed"] = dedup.duplicates
+    return hits
 
 
 def main():
@@ -108,17 +107,8 @@ def main():
         wb = load_workbook(step3_file)
         ws = wb.active
 
-        # 1. Clear K nếu H không phải Test report/TR
-        k_cleared = clear_k_if_not_test_report(ws)
-
-        # 2. Điền Art vào A nếu Q chứa Article
-        art_filled = fill_art_if_article_in_q(ws)
-
-        # 3. Xóa nội dung cột Q
-        q_cleared = clear_column_q(ws)
-
-        # 4. Loại bỏ dòng trùng lặp
-        duplicates_removed = remove_duplicate_rows(ws)
+        # Clear K, điền Art, xóa Q và loại bỏ dòng trùng trong một lượt
+        hits = cleanup_worksheet(ws)
 
         # Lưu file Step4
         output_filename = f"{base_name}-Step4.xlsx"
@@ -126,10 +116,10 @@ def main():
         wb.save(output_path)
 
         print(f"  {step3_file.name} → {output_filename}")
-        print(f"    - Cleared K: {k_cleared} rows")
-        print(f"    - Art filled: {art_filled} rows")
-        print(f"    - Q cleared: {q_cleared} cells")
-        print(f"    - Duplicates removed: {duplicates_removed} rows")
+        print(f"    - Cleared K: {hits['k_cleared']} rows")
+        print(f"    - Art filled: {hits['art_filled']} rows")
+        print(f"    - Q cleared: {hits['q_cleared']} cells")
+        print(f"    - Duplicates removed: {hits['duplicates_removed']} rows")
 
     print(f"\nHoàn thành!")
 
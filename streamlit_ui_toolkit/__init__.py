@@ -54,8 +54,10 @@ from .templates import (
     ColumnConfig,
     TemplateConfig,
     ExcelTemplateBuilder,
+    StyleRegistry,
     get_tss_17column_template,
     get_simple_template,
+    get_tss_style_registry,
 )
 
 __all__ = [
@@ -82,6 +84,8 @@ __all__ = [
     "ColumnConfig",
     "TemplateConfig",
     "ExcelTemplateBuilder",
+    "StyleRegistry",
     "get_tss_17column_template",
     "get_simple_template",
+    "get_tss_style_registry",
 ]
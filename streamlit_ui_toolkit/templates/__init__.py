@@ -5,17 +5,48 @@ Provides Excel template generation with:
 - Column configuration with colors, widths, fonts
 - Template builder for creating formatted Excel files
 - Pre-defined templates (TSS 17-column, simple templates)
+- Shared style registry (styles built once, reused by cell style id)
+- Compiled templates (cached by template fingerprint, stamped into new workbooks)
+- Column mappings (input -> output columns) compiled to row projections
 - YAML configuration support
 """
 
-from .schema import ColumnConfig, TemplateConfig
+from .schema import ColumnConfig, ColumnMapping, TemplateConfig
 from .builder import ExcelTemplateBuilder
-from .presets import get_tss_17column_template, get_simple_template
+from .styles import CellStyle, StyleRegistry, header_style_name
+from .compiled import (
+    ColumnProjection,
+    CompiledTemplate,
+    compile_mapping,
+    compile_template,
+    mapping_fingerprint,
+    template_fingerprint,
+)
+from .presets import (
+    get_tss_17column_template,
+    get_simple_template,
+    get_tss_column_mapping,
+    get_tss_compiled_template,
+    get_tss_style_registry,
+)
 
 __all__ = [
     "ColumnConfig",
+    "ColumnMapping",
     "TemplateConfig",
     "ExcelTemplateBuilder",
+    "CellStyle",
+    "StyleRegistry",
+    "header_style_name",
+    "CompiledTemplate",
+    "compile_template",
+    "template_fingerprint",
+    "ColumnProjection",
+    "compile_mapping",
+    "mapping_fingerprint",
     "get_tss_17column_template",
     "get_simple_template",
+    "get_tss_column_mapping",
+    "get_tss_compiled_template",
+    "get_tss_style_registry",
 ]
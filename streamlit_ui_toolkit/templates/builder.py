@@ -4,11 +4,10 @@ Extracted from SEDO TSS Converter step3_template_creation.py
 """
 
 import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.utils import get_column_letter
 from pathlib import Path
 from typing import Union, Optional
 from .schema import TemplateConfig
+from .compiled import compile_template
 
 
 class ExcelTemplateBuilder:
@@ -51,45 +50,8 @@ class ExcelTemplateBuilder:
         ws = wb.active
         ws.title = sheet_name
 
-        # Apply column configurations
-        for col_idx, col_config in enumerate(self.template.columns, 1):
-            # Write header text
-            cell = ws.cell(self.template.header_row, col_idx, col_config.name)
-
-            # Apply font styling
-            cell.font = Font(
-                bold=col_config.font_bold,
-                color=col_config.font_color
-            )
-
-            # Apply background fill
-            cell.fill = PatternFill(
-                start_color=col_config.bg_color,
-                end_color=col_config.bg_color,
-                fill_type="solid"
-            )
-
-            # Apply alignment
-            cell.alignment = Alignment(
-                horizontal=col_config.horizontal_align,
-                vertical=col_config.vertical_align,
-                wrap_text=col_config.wrap_text
-            )
-
-            # Set column width
-            col_letter = get_column_letter(col_idx)
-            ws.column_dimensions[col_letter].width = col_config.width
-
-        # Freeze panes if specified
-        if self.template.freeze_panes:
-            ws.freeze_panes = self.template.freeze_panes
-
-        # Enable auto-filter if specified
-        if self.template.auto_filter:
-            # Set auto-filter on header row
-            last_col = get_column_letter(len(self.template.columns))
-            filter_range = f"A{self.template.header_row}:{last_col}{self.template.header_row}"
-            ws.auto_filter.ref = filter_range
+        # Stamp header row, styles, widths, panes and filter (compiled once per template)
+        compile_template(self.template).stamp(ws)
 
         # Save workbook
         output_path = Path(output_path)
@@ -0,0 +1,191 @@
+"""
+Compiled Templates - TemplateConfig resolved once, stamped many times
+
+A CompiledTemplate holds everything a worksheet needs from a template
+(header cells, header styles, column widths, freeze panes, auto-filter)
+in ready-to-apply form. Compiled templates are cached by a fingerprint
+of the TemplateConfig, so a batch of conversions pays the setup once.
+
+A ColumnProjection is the same for a ColumnMapping: the mapping resolved
+into an itemgetter that moves a row of input values to output positions.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Callable, Dict, Optional, Tuple
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.filters import AutoFilter
+from .schema import ColumnMapping, TemplateConfig
+from .styles import StyleRegistry, BoundStyles, header_style_name
+
+_compiled_cache: Dict[str, "CompiledTemplate"] = {}
+_projection_cache: Dict[str, "ColumnProjection"] = {}
+
+
+def template_fingerprint(template: TemplateConfig) -> str:
+    """SHA-256 of the template configuration (changes with any column or layout setting)"""
+    payload = json.dumps(template.to_dict(), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """
+    Template ready to stamp into new worksheets
+
+    Attributes:
+        fingerprint: template_fingerprint of the source TemplateConfig
+        header_row: Row number for headers (1-indexed)
+        headers: (column index, header text, style name) per column
+        widths: (column letter, width) per column
+        freeze_panes: Cell reference for freeze panes or None
+        auto_filter_ref: Auto-filter range of the header row or None
+        styles: Registry with the header style of every column
+    """
+    fingerprint: str
+    header_row: int
+    headers: Tuple[Tuple[int, str, str], ...]
+    widths: Tuple[Tuple[str, float], ...]
+    freeze_panes: Optional[str]
+    auto_filter_ref: Optional[str]
+    styles: StyleRegistry
+
+    def apply_layout(self, ws) -> None:
+        """
+        Set column widths, freeze panes and auto-filter
+
+        Works for normal and write-only worksheets; on a write-only
+        worksheet call it before the first row is appended.
+        """
+        for col_letter, width in self.widths:
+            ws.column_dimensions[col_letter].width = width
+
+        if self.freeze_panes:
+            ws.freeze_panes = self.freeze_panes
+
+        if self.auto_filter_ref:
+            ws.auto_filter = AutoFilter(ref=self.auto_filter_ref)
+
+    def header_cells(self, ws, styles: Optional[BoundStyles] = None) -> list:
+        """Styled header cells for ``ws.append`` on a write-only worksheet"""
+        styles = styles or self.styles.bind(ws.parent)
+        return [styles.apply(WriteOnlyCell(ws, value=name), style_name) for _, name, style_name in self.headers]
+
+    def stamp(self, ws, styles: Optional[BoundStyles] = None) -> None:
+        """
+        Write the styled header row and apply the layout to a normal worksheet
+
+        Args:
+            ws: Target worksheet
+            styles: Styles already bound to the workbook; must contain the
+                    header styles (default: bind this template's styles)
+        """
+        styles = styles or self.styles.bind(ws.parent)
+        for col_idx, name, style_name in self.headers:
+            styles.apply(ws.cell(self.header_row, col_idx, name), style_name)
+
+        self.apply_layout(ws)
+
+
+def compile_template(template: TemplateConfig) -> CompiledTemplate:
+    """
+    Compile a template (cached by template_fingerprint)
+
+    Example:
+        compiled = compile_template(get_tss_17column_template())
+        for ws in worksheets:
+            compiled.stamp(ws)
+    """
+    fingerprint = template_fingerprint(template)
+    compiled = _compiled_cache.get(fingerprint)
+    if compiled is not None:
+        return compiled
+
+    styles = StyleRegistry()
+    styles.register_template(template)
+
+    auto_filter_ref = None
+    if template.auto_filter and template.columns:
+        last_col = get_column_letter(len(template.columns))
+        auto_filter_ref = f"A{template.header_row}:{last_col}{template.header_row}"
+
+    compiled = CompiledTemplate(
+        fingerprint=fingerprint,
+        header_row=template.header_row,
+        headers=tuple(
+            (col_idx, col_config.name, header_style_name(col_idx))
+            for col_idx, col_config in enumerate(template.columns, 1)
+        ),
+        widths=tuple(
+            (get_column_letter(col_idx), col_config.width)
+            for col_idx, col_config in enumerate(template.columns, 1)
+        ),
+        freeze_panes=template.freeze_panes,
+        auto_filter_ref=auto_filter_ref,
+        styles=styles,
+    )
+    _compiled_cache[fingerprint] = compiled
+    return compiled
+
+
+def mapping_fingerprint(mapping: ColumnMapping) -> str:
+    """SHA-256 of the column mapping configuration"""
+    payload = json.dumps(mapping.to_dict(), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class ColumnProjection:
+    """
+    Column mapping ready to project input rows
+
+    Attributes:
+        fingerprint: mapping_fingerprint of the source ColumnMapping
+        input_columns: Input columns to read; row values follow this order
+        output_columns: Number of values in an output record
+        scatter: itemgetter over (*values, None) that returns the output
+                 record (None at unmapped output positions)
+    """
+    fingerprint: str
+    input_columns: Tuple[int, ...]
+    output_columns: int
+    scatter: Callable[[tuple], tuple]
+
+    def project(self, values: tuple) -> Optional[list]:
+        """Output record of one row of ``input_columns`` values; None if they are all empty"""
+        return list(self.scatter(values + (None,))) if any(values) else None
+
+
+def compile_mapping(mapping: ColumnMapping) -> ColumnProjection:
+    """
+    Compile a column mapping (cached by mapping_fingerprint)
+
+    Example:
+        projection = compile_mapping(get_tss_column_mapping())
+        rows = [record for values in data_rows if (record := projection.project(values))]
+    """
+    fingerprint = mapping_fingerprint(mapping)
+    projection = _projection_cache.get(fingerprint)
+    if projection is not None:
+        return projection
+
+    input_columns = tuple(mapping.columns)
+    pad = len(input_columns)    # Index of the trailing None
+    positions = [pad] * mapping.output_columns
+    for pos, output_col in enumerate(mapping.columns.values()):
+        positions[output_col - 1] = pos
+
+    # itemgetter with a single index returns a value, not a tuple
+    scatter = itemgetter(*positions) if len(positions) > 1 else (lambda values: (values[positions[0]],))
+
+    projection = ColumnProjection(
+        fingerprint=fingerprint,
+        input_columns=input_columns,
+        output_columns=mapping.output_columns,
+        scatter=scatter,
+    )
+    _projection_cache[fingerprint] = projection
+    return projection
@@ -3,7 +3,17 @@ Template Presets - Pre-defined template configurations
 Extracted from SEDO TSS Converter step3_template_creation.py lines 65-83
 """
 
-from .schema import TemplateConfig, ColumnConfig
+from functools import lru_cache
+from openpyxl.styles import Font, PatternFill, Alignment
+from .schema import TemplateConfig, ColumnConfig, ColumnMapping
+from .styles import StyleRegistry
+from .compiled import CompiledTemplate, compile_template
+
+# Style names of the TSS product columns (R onwards), see get_tss_style_registry
+PRODUCT_NAME_STYLE = "product_name"    # Row 1: rotated product name on peach
+PRODUCT_FILL_STYLE = "product_fill"    # Rows 2-9: peach background of the merged name
+ARTICLE_STYLE = "article"              # Row 10: article number on peach
+MARK_STYLE = "mark"                    # Data rows: centered "X"
 
 
 def get_tss_17column_template() -> TemplateConfig:
@@ -166,3 +176,88 @@ def get_simple_template() -> TemplateConfig:
         header_row=1,
         auto_filter=True
     )
+
+
+def get_tss_column_mapping() -> ColumnMapping:
+    """
+    Get the TALIMEX Internal TSS -> TSS 17-column mapping
+
+    Input data columns B, D-L, N, O go to output columns Q, B-K, K, L.
+    Column Q only carries the MATERIAL value for the Step 4 cleanup.
+
+    Returns:
+        ColumnMapping for TALIMEX Internal TSS input files
+
+    Example:
+        from streamlit_ui_toolkit.templates import get_tss_column_mapping, compile_mapping
+
+        projection = compile_mapping(get_tss_column_mapping())
+    """
+    return ColumnMapping(
+        name="TALIMEX Internal TSS",
+        description="TALIMEX Internal TSS -> Standard TSS 17-column",
+        columns={
+            2: 17,  # B -> Q
+            4: 2,   # D -> B
+            5: 3,   # E -> C
+            6: 4,   # F -> D
+            7: 5,   # G -> E
+            8: 6,   # H -> F
+            9: 7,   # I -> G
+            10: 8,  # J -> H
+            11: 9,  # K -> I
+            12: 10, # L -> J
+            14: 11, # N -> K
+            15: 12, # O -> L
+        },
+        output_columns=17,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_tss_compiled_template() -> CompiledTemplate:
+    """
+    Get the compiled TSS 17-column template (built once per process)
+
+    Example:
+        get_tss_compiled_template().stamp(ws)
+    """
+    return compile_template(get_tss_17column_template())
+
+
+@lru_cache(maxsize=None)
+def get_tss_style_registry() -> StyleRegistry:
+    """
+    Get the shared TSS style registry (built once per process)
+
+    Contains the header style of each TSS 17-column template column
+    (header_style_name(1..17)) and the product column styles
+    PRODUCT_NAME_STYLE, PRODUCT_FILL_STYLE, ARTICLE_STYLE and MARK_STYLE.
+    The registry is shared, do not register additional styles on it.
+
+    Example:
+        styles = get_tss_style_registry().bind(wb)
+        styles.apply(ws.cell(11, 18, "X"), MARK_STYLE)
+    """
+    # Peach/salmon background (ARGB format)
+    peach_fill = PatternFill(start_color="FFFCD5B4", end_color="FFFCD5B4", fill_type="solid")
+    header_font = Font(bold=False)
+
+    registry = StyleRegistry()
+    registry.register_template(get_tss_17column_template())
+    registry.register(
+        PRODUCT_NAME_STYLE,
+        font=header_font,
+        fill=peach_fill,
+        alignment=Alignment(textRotation=90, vertical='center', horizontal='center', wrap_text=True)
+    )
+    registry.register(PRODUCT_FILL_STYLE, fill=peach_fill)
+    registry.register(
+        ARTICLE_STYLE,
+        font=header_font,
+        fill=peach_fill,
+        alignment=Alignment(vertical='center', horizontal='center')
+    )
+    registry.register(MARK_STYLE, alignment=Alignment(horizontal='center', vertical='center'))
+
+    return registry
@@ -1,5 +1,5 @@
 """
-Template Schema - Column and Template configuration dataclasses
+Template Schema - Column, Template and Column mapping configuration dataclasses
 Extracted from SEDO TSS Converter step3_template_creation.py
 """
 
@@ -7,6 +7,10 @@ from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 from pathlib import Path
 import yaml
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+# Output record width of a ColumnMapping: the TSS columns A-Q (product columns follow from R)
+MAPPING_OUTPUT_COLUMNS = 17
 
 
 @dataclass
@@ -150,3 +154,113 @@ class TemplateConfig:
             'auto_filter': self.auto_filter,
             'columns': [col.to_dict() for col in self.columns]
         }
+
+
+def _column_index(ref) -> int:
+    """Column index (1-indexed) from an index or a column letter ("B")"""
+    if isinstance(ref, int):
+        return ref
+    ref = str(ref).strip()
+    return int(ref) if ref.isdigit() else column_index_from_string(ref.upper())
+
+
+@dataclass
+class ColumnMapping:
+    """
+    Input -> output column mapping of one supplier layout
+
+    Attributes:
+        name: Mapping name
+        columns: Input column index -> output column index (1-indexed),
+                 in the order the input columns are read
+        description: Mapping description
+        output_columns: Number of output columns; must be MAPPING_OUTPUT_COLUMNS
+                        (17 = A-Q), the converter, the Step 4 cleanup rules
+                        and the product columns from R depend on it
+    """
+    name: str
+    columns: Dict[int, int] = field(default_factory=dict)
+    description: str = ""
+    output_columns: int = MAPPING_OUTPUT_COLUMNS
+
+    def __post_init__(self):
+        if self.output_columns != MAPPING_OUTPUT_COLUMNS:
+            raise ValueError(
+                f"Column mapping '{self.name}': output_columns must be {MAPPING_OUTPUT_COLUMNS} "
+                f"(TSS columns A-Q), got {self.output_columns}"
+            )
+        outputs = list(self.columns.values())
+        if len(set(outputs)) != len(outputs):
+            raise ValueError(f"Column mapping '{self.name}' maps several input columns to one output column")
+        for output_col in outputs:
+            if not 1 <= output_col <= self.output_columns:
+                raise ValueError(
+                    f"Column mapping '{self.name}': output column {output_col} "
+                    f"is outside 1-{self.output_columns}"
+                )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ColumnMapping":
+        """Create ColumnMapping from dictionary (columns as indexes or letters)"""
+        return cls(
+            name=data.get('name', 'Untitled'),
+            description=data.get('description', ''),
+            columns={
+                _column_index(input_col): _column_index(output_col)
+                for input_col, output_col in (data.get('columns') or {}).items()
+            },
+            output_columns=data.get('output_columns', MAPPING_OUTPUT_COLUMNS),
+        )
+
+    @classmethod
+    def from_yaml(cls, path: str) -> "ColumnMapping":
+        """
+        Load column mapping from YAML file
+
+        Args:
+            path: Path to YAML config file
+
+        Returns:
+            ColumnMapping instance
+
+        Example YAML structure:
+            name: "TALIMEX Internal TSS"
+            output_columns: 17
+            columns:
+              B: Q
+              D: B
+              E: C
+        """
+        config_path = Path(path)
+        if not config_path.exists():
+            raise FileNotFoundError(f"Column mapping config not found: {path}")
+
+        with open(config_path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f)
+
+        return cls.from_dict(data or {})
+
+    def to_yaml(self, path: str) -> None:
+        """
+        Export column mapping to YAML file
+
+        Args:
+            path: Output YAML file path
+        """
+        output_path = Path(path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            yaml.dump(self.to_dict(), f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary (columns as letters)"""
+        return {
+            'name': self.name,
+            'description': self.description,
+            'output_columns': self.output_columns,
+            'columns': {
+                get_column_letter(input_col): get_column_letter(output_col)
+                for input_col, output_col in self.columns.items()
+            },
+        }
@@ -0,0 +1,171 @@
+"""
+Style Registry - Shared cell styles for Excel templates
+
+Styles are defined once per process and bound to a workbook once;
+cells then reference the cached style ids instead of building and
+hashing Font/PatternFill/Alignment objects cell by cell.
+
+Setting style ids directly uses openpyxl internals (the workbook style
+tables and cell._style). That is only done on the openpyxl releases in
+TESTED_OPENPYXL_VERSIONS; on any other release the styles are registered
+as NamedStyles and applied through the public cell.style API (slower).
+"""
+
+from copy import copy
+from dataclasses import dataclass
+from typing import Dict, Optional
+import openpyxl
+from openpyxl.styles import Font, PatternFill, Alignment, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from .schema import ColumnConfig, TemplateConfig
+
+# (major, minor) openpyxl releases whose style internals BoundStyles was tested against
+TESTED_OPENPYXL_VERSIONS = ((3, 1),)
+
+
+@dataclass(frozen=True)
+class CellStyle:
+    """
+    Font, fill and alignment of a registered style
+
+    Attributes:
+        font: Font or None to keep the default font
+        fill: PatternFill or None for no fill
+        alignment: Alignment or None for the default alignment
+    """
+    font: Optional[Font] = None
+    fill: Optional[PatternFill] = None
+    alignment: Optional[Alignment] = None
+
+    @classmethod
+    def from_column(cls, col_config: ColumnConfig) -> "CellStyle":
+        """Header cell style of a template column"""
+        return cls(
+            font=Font(bold=col_config.font_bold, color=col_config.font_color),
+            fill=PatternFill(start_color=col_config.bg_color, end_color=col_config.bg_color, fill_type="solid"),
+            alignment=Alignment(
+                horizontal=col_config.horizontal_align,
+                vertical=col_config.vertical_align,
+                wrap_text=col_config.wrap_text
+            ),
+        )
+
+
+def header_style_name(col_idx: int) -> str:
+    """Registry name of the header style of template column ``col_idx`` (1-indexed)"""
+    return f"header:{col_idx}"
+
+
+class StyleRegistry:
+    """
+    Named cell styles shared by every workbook of a process
+
+    Example:
+        registry = StyleRegistry()
+        registry.register("mark", alignment=Alignment(horizontal="center"))
+
+        styles = registry.bind(wb)
+        for cell in cells:
+            styles.apply(cell, "mark")
+    """
+
+    def __init__(self):
+        self._styles: Dict[str, CellStyle] = {}
+
+    def register(self,
+                 name: str,
+                 font: Optional[Font] = None,
+                 fill: Optional[PatternFill] = None,
+                 alignment: Optional[Alignment] = None) -> None:
+        """Register (or replace) a named style"""
+        self._styles[name] = CellStyle(font=font, fill=fill, alignment=alignment)
+
+    def register_template(self, template: TemplateConfig) -> None:
+        """Register the header style of every template column (see header_style_name)"""
+        for col_idx, col_config in enumerate(template.columns, 1):
+            self._styles[header_style_name(col_idx)] = CellStyle.from_column(col_config)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._styles
+
+    @property
+    def names(self) -> list:
+        return list(self._styles)
+
+    def bind(self, workbook) -> "BoundStyles":
+        """Resolve every registered style to style ids of ``workbook``"""
+        return BoundStyles(self._styles, workbook)
+
+
+def _openpyxl_release() -> tuple:
+    return tuple(int(part) for part in openpyxl.__version__.split(".")[:2])
+
+
+class _StyleIds:
+    """
+    Direct style-id access on openpyxl internals (the only place that uses them)
+
+    ``for_workbook`` returns None unless the installed openpyxl release is
+    in TESTED_OPENPYXL_VERSIONS and the workbook has the expected tables.
+    """
+
+    def __init__(self, workbook):
+        from openpyxl.styles.cell_style import StyleArray
+        self._workbook = workbook
+        self._style_array = StyleArray
+
+    @classmethod
+    def for_workbook(cls, workbook) -> Optional["_StyleIds"]:
+        if _openpyxl_release() not in TESTED_OPENPYXL_VERSIONS:
+            return None
+        if not all(hasattr(workbook, table) for table in ("_fonts", "_fills", "_alignments")):
+            return None
+        return cls(workbook)
+
+    def style_array(self, style: CellStyle):
+        """Style ids of ``style`` in the workbook (fonts/fills/alignments are added once)"""
+        style_array = self._style_array()
+        if style.font is not None:
+            style_array.fontId = self._workbook._fonts.add(style.font)
+        if style.fill is not None:
+            style_array.fillId = self._workbook._fills.add(style.fill)
+        if style.alignment is not None:
+            style_array.alignmentId = self._workbook._alignments.add(style.alignment)
+        return style_array
+
+    @staticmethod
+    def set(cell, style_array) -> None:
+        cell._style = copy(style_array)
+
+
+class BoundStyles:
+    """Style ids of a StyleRegistry inside one workbook (normal or write-only)"""
+
+    def __init__(self, styles: Dict[str, CellStyle], workbook):
+        self._ids = _StyleIds.for_workbook(workbook)
+        self._arrays = {}
+        if self._ids is not None:
+            for name, style in styles.items():
+                self._arrays[name] = self._ids.style_array(style)
+            return
+
+        # Public fallback: one NamedStyle per registered style
+        existing = set(workbook.named_styles)
+        for name, style in styles.items():
+            if name in existing:
+                continue
+            # No font means the workbook default font, like style id 0
+            named_style = NamedStyle(name=name, font=copy(style.font or DEFAULT_FONT))
+            if style.fill is not None:
+                named_style.fill = copy(style.fill)
+            if style.alignment is not None:
+                named_style.alignment = copy(style.alignment)
+            workbook.add_named_style(named_style)
+
+    def apply(self, cell, name: str):
+        """Give ``cell`` the registered style ``name``; returns the cell"""
+        if self._ids is not None:
+            self._ids.set(cell, self._arrays[name])
+        else:
+            cell.style = name
+        return cell
@@ -0,0 +1,28 @@
+"""
+Shared pytest setup: the repository root is importable and the cached
+column mapping can be switched per test
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def use_column_mapping(monkeypatch):
+    """Point $TSS_COLUMN_MAPPING at a YAML file for one test (cached mapping is reset around it)"""
+    from step3_copy_data import COLUMN_MAPPING_ENV, get_column_mapping, get_column_projection
+
+    def reset():
+        get_column_mapping.cache_clear()
+        get_column_projection.cache_clear()
+
+    def use(path):
+        monkeypatch.setenv(COLUMN_MAPPING_ENV, str(path))
+        reset()
+
+    yield use
+    reset()
@@ -0,0 +1,96 @@
+"""Round trip and corruption handling of the .tssc checkpoint format"""
+
+import datetime
+import io
+import math
+
+import pytest
+
+from checkpoint import CheckpointError, ROWS_PER_FRAME, read_checkpoint, write_checkpoint
+
+VALUES = [
+    None, True, False,
+    0, -1, (1 << 63) - 1, -(1 << 63), 1 << 80, -(1 << 90),
+    1.5, -0.0, float("inf"), 1e-300,
+    "", "text", "ünïcödé ✓ 中文", "emoji 😀", "lone \ud800 surrogate", "line\nbreak\x00nul",
+    datetime.datetime(2024, 2, 29, 23, 59, 58, 123456),
+    datetime.datetime(2024, 1, 1, 8, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=7))),
+    datetime.date(1900, 1, 1),
+    datetime.time(12, 30, 15, 500),
+    datetime.timedelta(days=1, hours=2, seconds=3.5),
+]
+
+
+def checkpoint_bytes(rows, columns, **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    write_checkpoint(buffer, ["Product ✓", None, "P\ud800"], ["A-1", 12], rows, columns=columns, **kwargs)
+    return buffer.getvalue()
+
+
+def assert_same_values(actual, expected):
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        assert type(a) is type(e), (a, e)
+        if isinstance(e, float) and math.isnan(e):
+            assert math.isnan(a)
+        else:
+            assert a == e
+            if isinstance(e, float):
+                assert math.copysign(1, a) == math.copysign(1, e)
+
+
+def test_round_trip_every_value_type(tmp_path):
+    rows = [VALUES, list(reversed(VALUES))]
+    path = tmp_path / "x-Step3.tssc"
+    assert write_checkpoint(path, ["Product ✓"], ["A-1"], rows, stage="Step3",
+                            source="input ✓.xlsx", columns=len(VALUES)) == 2
+
+    checkpoint = read_checkpoint(path)
+    assert (checkpoint.stage, checkpoint.source, checkpoint.columns) == ("Step3", "input ✓.xlsx", len(VALUES))
+    assert checkpoint.product_names == ["Product ✓"]
+    assert checkpoint.article_numbers == ["A-1"]
+    for actual, expected in zip(checkpoint.rows, rows):
+        assert_same_values(actual, expected)
+
+
+def test_nan_round_trip():
+    checkpoint = read_checkpoint(checkpoint_bytes([[float("nan")]], columns=1))
+    assert math.isnan(checkpoint.rows[0][0])
+
+
+def test_rows_span_several_frames():
+    rows = [[i, f"row {i}", None] for i in range(ROWS_PER_FRAME * 2 + 3)]
+    checkpoint = read_checkpoint(checkpoint_bytes(rows, columns=3))
+    assert checkpoint.rows == rows
+    assert checkpoint.product_names == ["Product ✓", None, "P\ud800"]
+
+
+def test_empty_checkpoint():
+    checkpoint = read_checkpoint(checkpoint_bytes([], columns=17))
+    assert checkpoint.rows == []
+
+
+def test_row_width_is_checked_on_write():
+    with pytest.raises(ValueError):
+        checkpoint_bytes([[1, 2]], columns=3)
+
+
+def test_every_corrupted_byte_raises():
+    data = checkpoint_bytes([[1, "a", datetime.date(2020, 1, 2)], [None, 2.5, True]], columns=3)
+    for pos in range(len(data)):
+        corrupted = bytearray(data)
+        corrupted[pos] ^= 0xFF
+        with pytest.raises(CheckpointError):
+            read_checkpoint(bytes(corrupted))
+
+
+def test_every_truncation_raises():
+    data = checkpoint_bytes([[1, "a"], [None, 2.5]], columns=2)
+    for size in range(len(data)):
+        with pytest.raises(CheckpointError):
+            read_checkpoint(data[:size])
+
+
+def test_not_a_checkpoint():
+    with pytest.raises(CheckpointError, match="Not a TSS checkpoint"):
+        read_checkpoint(b"PK\x03\x04 not a checkpoint")
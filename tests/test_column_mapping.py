@@ -0,0 +1,86 @@
+"""Converting with a non-default YAML column mapping"""
+
+import io
+
+import pytest
+import yaml
+from openpyxl import load_workbook
+
+from converter import convert, convert_bytes
+from input_reader import parse_input
+from step3_copy_data import get_column_mapping, get_column_projection
+from streamlit_ui_toolkit.templates import ColumnMapping
+
+from workbooks import input_workbook
+
+# Supplier layout: C = material, F-G = type/sub-type, H = document type, I = regulation, J = limit
+SUPPLIER_MAPPING = {
+    "name": "Supplier X",
+    "output_columns": 17,
+    "columns": {"C": "Q", "F": "B", "G": "C", "H": "H", "I": "K", "J": "L"},
+}
+
+SUPPLIER_ROWS = {
+    10: {3: "Article 5", 6: "Type A", 7: "Sub A", 8: "Test report", 9: "Lead", 10: "0.1"},
+    11: {3: "Mat", 6: "Type B", 7: "Sub B", 8: "Declaration", 9: "Cadmium", 10: "0.2"},
+    12: {3: "Mat", 6: "Type B", 7: "Sub B", 8: "Declaration", 9: "Cadmium", 10: "0.2"},
+}
+
+
+def write_mapping(tmp_path, data) -> str:
+    path = tmp_path / "mapping.yaml"
+    path.write_text(yaml.safe_dump(data), encoding="utf-8")
+    return path
+
+
+def data_rows(output: bytes) -> list[tuple]:
+    ws = load_workbook(io.BytesIO(output)).active
+    return [row for row in ws.iter_rows(min_row=11, max_col=19, values_only=True)]
+
+
+@pytest.mark.parametrize("write_only", [True, False])
+def test_convert_with_yaml_mapping(tmp_path, use_column_mapping, write_only):
+    use_column_mapping(write_mapping(tmp_path, SUPPLIER_MAPPING))
+    assert get_column_mapping().name == "Supplier X"
+
+    source = input_workbook(SUPPLIER_ROWS)
+    parsed = parse_input(source, get_column_projection().input_columns)
+    output = convert(parsed, write_only=write_only)
+
+    ws = load_workbook(io.BytesIO(output)).active
+    assert [ws.cell(10, col).value for col in (18, 19)] == ["A-1", "A-2"]
+    assert ws.cell(1, 18).value == "P1"
+
+    # Row 12 duplicates row 11; K is cleared unless H is a test report; Q is cleared
+    first, second = data_rows(output)
+    assert first[:17] == ("Art", "Type A", "Sub A", None, None, None, None, "Test report",
+                          None, None, "Lead", "0.1", None, None, None, None, None)
+    assert second[:17] == (None, "Type B", "Sub B", None, None, None, None, "Declaration",
+                           None, None, None, "0.2", None, None, None, None, None)
+    assert first[17:] == second[17:] == ("X", "X")
+
+
+def test_convert_bytes_uses_env_mapping(tmp_path, use_column_mapping):
+    use_column_mapping(write_mapping(tmp_path, SUPPLIER_MAPPING))
+    rows = data_rows(convert_bytes(input_workbook(SUPPLIER_ROWS)))
+    assert [row[1] for row in rows] == ["Type A", "Type B"]
+
+
+@pytest.mark.parametrize("output_columns", [12, 20])
+def test_mapping_rejects_other_output_widths(tmp_path, use_column_mapping, output_columns):
+    use_column_mapping(write_mapping(tmp_path, {**SUPPLIER_MAPPING, "output_columns": output_columns}))
+    with pytest.raises(ValueError, match="output_columns must be 17"):
+        get_column_mapping()
+
+
+def test_mapping_rejects_duplicate_and_out_of_range_targets():
+    with pytest.raises(ValueError):
+        ColumnMapping(name="dup", columns={2: 3, 4: 3})
+    with pytest.raises(ValueError):
+        ColumnMapping(name="range", columns={2: 18})
+
+
+def test_mapping_yaml_round_trip(tmp_path):
+    mapping = ColumnMapping.from_dict(SUPPLIER_MAPPING)
+    mapping.to_yaml(tmp_path / "out.yaml")
+    assert ColumnMapping.from_yaml(tmp_path / "out.yaml") == mapping
@@ -0,0 +1,148 @@
+"""The xml reader engine gives the same values as openpyxl read-only mode"""
+
+import datetime
+
+import pytest
+
+from input_reader import (
+    OpenpyxlEngine,
+    UnsupportedWorkbook,
+    XmlEngine,
+    load_sheets,
+    parse_input,
+    read_header_values,
+)
+from step0_validate import EXPECTED_HEADERS, HEADER_ROW
+from step3_copy_data import get_column_projection
+
+from workbooks import STRICT_NS, input_workbook, raw_workbook
+
+ENGINES = (XmlEngine.name, OpenpyxlEngine.name)
+HEADER_COLUMNS = tuple(EXPECTED_HEADERS)
+
+SHARED_STRINGS = (
+    "<si><t>Product name:</t></si>",                                            # 0
+    '<si><r><t>P1</t></r><r><rPr><b/></rPr><t xml:space="preserve">&#10;P2</t></r></si>',  # 1 rich text
+    "<si><t>MATERIAL</t></si>",                                                 # 2
+    "<si><t>Line_x005F_x000D_break</t></si>",                                   # 3 escaped
+    "<si><t>Kanji</t><rPh sb=\"0\" eb=\"1\"><t>kana</t></rPh></si>",            # 4 phonetic run
+    '<si><t xml:space="preserve">  padded  </t></si>',                          # 5
+)
+
+
+def data_sheet() -> dict:
+    """Rows covering every cell encoding the xml engine decodes itself"""
+    return {
+        1: '<c r="A1" t="s"><v>0</v></c><c r="C1" t="s"><v>1</v></c>',
+        2: '<c r="A2" t="inlineStr"><is><t>Article Number</t></is></c>'
+           '<c r="C2" t="inlineStr"><is><t>A-1&#10;A-2</t></is></c>',
+        9: '<c r="B9" t="s"><v>2</v></c>'
+           '<c r="D9" t="str"><f>"GENERAL"&amp;" TYPE"</f><v>GENERAL TYPE</v></c>'
+           '<c r="E9" t="inlineStr"><is><t>Sub-type</t></is></c>',
+        10: '<c r="B10"><v>42</v></c>'
+            '<c r="D10"><v>1.5</v></c>'
+            '<c r="E10"><v>1E3</v></c>'
+            '<c r="F10" t="b"><v>1</v></c>'
+            '<c r="G10" t="e"><v>#N/A</v></c>'
+            '<c r="H10" s="1"><v>44197</v></c>'
+            '<c r="I10" s="2"><v>44197.5</v></c>'
+            '<c r="J10" s="3"><v>1.25</v></c>'
+            '<c r="K10" s="4"><v>0.5</v></c>'
+            '<c r="L10" t="s"><v>3</v></c>'
+            '<c r="N10" t="d"><v>2021-01-01T12:30:00</v></c>'
+            '<c r="O10" t="str"><f>B10&amp;"x"</f><v>42x</v></c>',
+        11: '<c r="B11" t="s"><v>4</v></c><c r="D11" t="b"><v>0</v></c><c r="E11" t="s"><v>5</v></c>'
+            '<c r="F11" s="1"><v>0</v></c><c r="G11"><v>-7</v></c>',
+        12: '<c r="M12"><v>1</v></c>',                   # Only unmapped columns: dropped
+        14: '<c r="O14" t="inlineStr"><is><r><t>rich</t></r><r><t> inline</t></r></is></c>',
+    }
+
+
+def fixture_workbook(date1904=False) -> bytes:
+    return raw_workbook(
+        {"Data": data_sheet(), "Material Code": {10: '<c r="B10"><v>1</v></c>'}},
+        shared_strings=SHARED_STRINGS,
+        date1904=date1904,
+    )
+
+
+def parse(source, engine):
+    return parse_input(source, get_column_projection().input_columns, HEADER_ROW, HEADER_COLUMNS, engine=engine)
+
+
+@pytest.mark.parametrize("date1904", [False, True])
+def test_parse_input_engines_agree(date1904):
+    source = fixture_workbook(date1904)
+    xml, reference = (parse(source, engine) for engine in ENGINES)
+    assert xml == reference
+
+    sheet = xml.sheets[0]
+    assert [s.name for s in xml.sheets] == ["Data"]
+    assert sheet.product_names == ["P1", "P2"]
+    assert sheet.article_numbers == ["A-1", "A-2"]
+    assert len(sheet.data_rows) == 3
+
+    # The fixture really exercises the decoders
+    values = set(sheet.data_rows[0]) | set(sheet.data_rows[1])
+    assert {42, 1.5, 1000.0, True, "#N/A", "Line_x000D_break", "Kanji", "  padded  ", "=B10&\"x\""} <= values
+    assert any(isinstance(v, datetime.datetime) for v in values)
+    assert any(isinstance(v, datetime.timedelta) for v in values)
+    assert any(isinstance(v, datetime.time) for v in values)
+
+
+@pytest.mark.parametrize("date1904", [False, True])
+def test_read_header_values_engines_agree(date1904):
+    source = fixture_workbook(date1904)
+    xml, reference = (read_header_values(source, HEADER_ROW, HEADER_COLUMNS, engine=engine) for engine in ENGINES)
+    assert xml == reference
+    # Formula header cells give their cached value
+    assert xml[2] == "MATERIAL" and xml[4] == "GENERAL TYPE"
+    assert parse(source, XmlEngine.name).header_values == xml
+
+
+def non_empty(sheets: dict) -> dict:
+    return {name: [(row, values) for row, values in rows if any(v is not None for v in values)]
+            for name, rows in sheets.items()}
+
+
+def test_load_sheets_engines_agree():
+    source = fixture_workbook()
+    columns = [1, 2, 3, 4, 8, 9, 14, 15]
+    xml, reference = (load_sheets(source, columns, rows=(1, 20), engine=engine) for engine in ENGINES)
+    # openpyxl pads missing rows up to rows[1]; the xml engine only yields rows in the sheet XML
+    assert non_empty(xml) == non_empty(reference)
+    assert list(xml) == ["Data", "Material Code"]
+
+
+def test_openpyxl_written_workbook_engines_agree():
+    source = input_workbook(
+        {
+            9: {col: text.upper() for col, text in EXPECTED_HEADERS.items()},
+            10: {2: "Article", 4: "Type", 5: 3, 6: 2.25, 7: True, 15: datetime.datetime(2020, 2, 3, 4, 5)},
+            11: {2: "Mat", 14: "=A1&\"x\"", 15: datetime.date(2021, 5, 6)},
+        },
+        extra_sheets=("Material Code", "Second"),
+    )
+    assert parse(source, XmlEngine.name) == parse(source, OpenpyxlEngine.name)
+
+
+def shared_formula_workbook() -> bytes:
+    data = data_sheet()
+    data[13] = '<c r="B13"><f t="shared" ref="B13:B14" si="0">B10*2</f><v>84</v></c>'
+    return raw_workbook({"Data": data}, shared_strings=SHARED_STRINGS)
+
+
+def test_shared_formula_is_unsupported_by_xml_engine():
+    with pytest.raises(UnsupportedWorkbook):
+        parse(shared_formula_workbook(), XmlEngine.name)
+
+
+def test_auto_engine_falls_back_to_openpyxl():
+    source = shared_formula_workbook()
+    assert parse(source, "auto") == parse(source, OpenpyxlEngine.name)
+
+
+def test_strict_ooxml_is_unsupported_by_xml_engine():
+    source = raw_workbook({"Data": data_sheet()}, shared_strings=SHARED_STRINGS, namespace=STRICT_NS)
+    with pytest.raises(UnsupportedWorkbook):
+        XmlEngine(source)
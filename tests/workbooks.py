@@ -0,0 +1,147 @@
+"""Small input workbooks for the tests: built with openpyxl, or assembled from raw XML"""
+
+import io
+import zipfile
+
+from openpyxl import Workbook
+
+
+def input_workbook(data_rows: dict, product_names=("P1", "P2"), article_numbers=("A-1", "A-2"),
+                   extra_sheets=()) -> bytes:
+    """
+    TALIMEX-style input workbook as xlsx bytes
+
+    Args:
+        data_rows: Row number -> {column index (1-based): value}
+        product_names: Written under a "Product name:" label in row 1
+        article_numbers: Written under an "Article Number" label in row 2
+        extra_sheets: Names of additional (empty) sheets, e.g. "Material Code"
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Sheet1"
+    ws.cell(1, 1, "Product name:")
+    ws.cell(1, 3, "\n".join(product_names))
+    ws.cell(2, 1, "Article Number")
+    ws.cell(2, 3, "\n".join(article_numbers))
+    for row, values in data_rows.items():
+        for col, value in values.items():
+            ws.cell(row, col, value)
+    for name in extra_sheets:
+        wb.create_sheet(name)
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>
+{sheet_overrides}
+</Types>"""
+
+SHEET_OVERRIDE = ('<Override PartName="/xl/worksheets/sheet{n}.xml" '
+                  'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>')
+
+PACKAGE_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="{namespace}" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<workbookPr{date1904}/>
+<bookViews><workbookView activeTab="{active_tab}"/></bookViews>
+<sheets>{sheets}</sheets>
+</workbook>"""
+
+WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rIdStyles" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+<Relationship Id="rIdStrings" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml"/>
+{sheet_rels}
+</Relationships>"""
+
+SHEET_REL = ('<Relationship Id="rId{n}" Target="worksheets/sheet{n}.xml" '
+             'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>')
+
+# Cell styles (s=): 0 General, 1 builtin date (14), 2 datetime, 3 timedelta, 4 time of day
+STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<numFmts count="3">
+<numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm"/>
+<numFmt numFmtId="165" formatCode="[h]:mm:ss"/>
+<numFmt numFmtId="166" formatCode="h:mm"/>
+</numFmts>
+<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="1"><fill><patternFill patternType="none"/></fill></fills>
+<borders count="1"><border/></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="5">
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>
+<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="166" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+</cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>"""
+
+SHARED_STRINGS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="{count}" uniqueCount="{count}">
+{items}
+</sst>"""
+
+WORKSHEET = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<dimension ref="A1"/>
+<sheetData>{rows}</sheetData>
+</worksheet>"""
+
+SPREADSHEETML_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+STRICT_NS = "http://purl.oclc.org/ooxml/spreadsheetml/main"
+
+
+def raw_workbook(sheets: dict, shared_strings=(), date1904: bool = False, active_tab: int = 0,
+                 namespace: str = SPREADSHEETML_NS) -> bytes:
+    """
+    xlsx bytes assembled from raw XML, for cell encodings openpyxl does not write itself
+
+    Args:
+        sheets: Sheet name -> {row number: "<c .../>..." cell XML of that row}
+        shared_strings: <si> item XML strings (shared string index = position)
+        date1904: Use the 1904 date system
+        active_tab: Index of the active sheet
+        namespace: Namespace of the workbook part (STRICT_NS for strict OOXML)
+    """
+    names = list(sheets)
+    numbers = range(1, len(names) + 1)
+    parts = {
+        "[Content_Types].xml": CONTENT_TYPES.format(
+            sheet_overrides="\n".join(SHEET_OVERRIDE.format(n=n) for n in numbers)),
+        "_rels/.rels": PACKAGE_RELS,
+        "xl/workbook.xml": WORKBOOK.format(
+            namespace=namespace,
+            date1904=' date1904="1"' if date1904 else "",
+            active_tab=active_tab,
+            sheets="".join(f'<sheet name="{name}" sheetId="{n}" r:id="rId{n}"/>'
+                           for n, name in zip(numbers, names))),
+        "xl/_rels/workbook.xml.rels": WORKBOOK_RELS.format(
+            sheet_rels="\n".join(SHEET_REL.format(n=n) for n in numbers)),
+        "xl/styles.xml": STYLES,
+        "xl/sharedStrings.xml": SHARED_STRINGS.format(count=len(shared_strings), items="\n".join(shared_strings)),
+    }
+    for n, name in zip(numbers, names):
+        rows = "".join(f'<row r="{row}">{cells}</row>' for row, cells in sorted(sheets[name].items()))
+        parts[f"xl/worksheets/sheet{n}.xml"] = WORKSHEET.format(rows=rows)
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, xml in parts.items():
+            zf.writestr(name, xml)
+    return buffer.getvalue()
@@ -0,0 +1,309 @@
+"""
+Worker Pool - Conversion worker processes shared by the app server
+Each worker is a separate (spawned) process, so the openpyxl work of
+concurrent sessions no longer competes for the server's GIL. A task runs
+on one idle worker; progress messages are relayed to the caller, and a
+task that passes its timeout is stopped by killing its worker, which is
+replaced by a fresh process for the next task.
+
+openpyxl fragments the heap and freed memory is rarely returned to the
+OS, so workers are recycled (replaced by a fresh process) after a number
+of tasks or once their RSS passes a threshold. While a task runs, a
+watchdog checks the worker's RSS and kills the task past a hard ceiling.
+"""
+
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from typing import Callable, Optional
+
+MB = 1024 * 1024
+
+POLL_INTERVAL = 0.5             # Seconds between checks while a task runs
+DEFAULT_JOB_TIMEOUT = 10 * 60   # Seconds
+DEFAULT_MAX_TASKS = 50          # Tasks per worker before it is recycled
+DEFAULT_RECYCLE_RSS = 1024 * MB     # Recycle an idle worker above this RSS
+DEFAULT_MEMORY_CEILING = 4096 * MB  # Kill a task whose worker goes above this RSS
+JOB_TIMEOUT_ENV = "TSS_JOB_TIMEOUT"
+MAX_TASKS_ENV = "TSS_WORKER_MAX_JOBS"
+RECYCLE_RSS_ENV = "TSS_WORKER_RECYCLE_MB"
+MEMORY_CEILING_ENV = "TSS_WORKER_MEMORY_LIMIT_MB"
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class WorkerError(Exception):
+    """A task raised an exception in the worker (message: '<type>: <message>' of the original)"""
+
+
+class JobTimeout(WorkerError):
+    """A task ran longer than its timeout; its worker was killed"""
+
+
+class WorkerCrashed(WorkerError):
+    """The worker process exited while running a task"""
+
+
+class MemoryLimitExceeded(WorkerError):
+    """The worker went past the memory ceiling while running a task; it was killed"""
+
+
+def _env_number(name: str, default: float, scale: float = 1) -> float:
+    env_value = os.environ.get(name)
+    return float(env_value) * scale if env_value else default
+
+
+def default_job_timeout() -> float:
+    """Per-job timeout: $TSS_JOB_TIMEOUT seconds, else DEFAULT_JOB_TIMEOUT"""
+    return _env_number(JOB_TIMEOUT_ENV, DEFAULT_JOB_TIMEOUT)
+
+
+def default_max_tasks() -> int:
+    """Tasks per worker: $TSS_WORKER_MAX_JOBS, else DEFAULT_MAX_TASKS"""
+    return int(_env_number(MAX_TASKS_ENV, DEFAULT_MAX_TASKS))
+
+
+def default_recycle_rss() -> int:
+    """Recycle threshold: $TSS_WORKER_RECYCLE_MB, else DEFAULT_RECYCLE_RSS"""
+    return int(_env_number(RECYCLE_RSS_ENV, DEFAULT_RECYCLE_RSS, MB))
+
+
+def default_memory_ceiling() -> int:
+    """Watchdog ceiling: $TSS_WORKER_MEMORY_LIMIT_MB, else DEFAULT_MEMORY_CEILING"""
+    return int(_env_number(MEMORY_CEILING_ENV, DEFAULT_MEMORY_CEILING, MB))
+
+
+def process_rss(pid: int) -> Optional[int]:
+    """Resident set size of a process in bytes from /proc/<pid>/statm; None if unavailable"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _worker_main(conn) -> None:
+    """Worker process loop: run (fn, args) tasks until the pipe closes"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    def progress_callback(step, status):
+        conn.send(("progress", step, status))
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+
+        fn, args = task
+        try:
+            result = fn(*args, progress_callback)
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+        else:
+            conn.send(("done", result))
+
+
+class _Worker:
+    """One worker process and the parent end of its pipe"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks_done = 0
+
+    @property
+    def rss(self) -> Optional[int]:
+        return process_rss(self.process.pid)
+
+    def stop(self) -> None:
+        """Ask the worker to exit; kill it if it does not"""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=1.0)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    Fixed number of worker processes, started on demand
+
+    Tasks are module-level functions called as ``fn(*args, progress_callback)``
+    in the worker; arguments and result are pickled. ``stats`` counts
+    recycled workers and tasks stopped by the timeout or the watchdog.
+
+    Example:
+        pool = WorkerPool(max_workers=4, timeout=600)
+        output = pool.run(convert_bytes, file_bytes, progress_callback=update)
+    """
+
+    def __init__(self,
+                 max_workers: int = 2,
+                 timeout: Optional[float] = DEFAULT_JOB_TIMEOUT,
+                 max_tasks: Optional[int] = DEFAULT_MAX_TASKS,
+                 recycle_rss: Optional[int] = DEFAULT_RECYCLE_RSS,
+                 memory_ceiling: Optional[int] = DEFAULT_MEMORY_CEILING,
+                 start_method: str = "spawn"):
+        """
+        Initialize WorkerPool
+
+        Args:
+            max_workers: Number of worker processes
+            timeout: Default per-task timeout in seconds (None = no limit)
+            max_tasks: Recycle a worker after this many tasks (None = never)
+            recycle_rss: Recycle a worker whose RSS is above this many bytes
+                         after a task (None = never)
+            memory_ceiling: Kill a task whose worker RSS goes above this many
+                            bytes (None = no watchdog)
+            start_method: multiprocessing start method; 'spawn' keeps the
+                          server's threads and state out of the workers
+        """
+        self.max_workers = max(max_workers, 1)
+        self.timeout = timeout
+        self.max_tasks = max_tasks
+        self.recycle_rss = recycle_rss
+        self.memory_ceiling = memory_ceiling
+        self.stats = {"started": 0, "recycled": 0, "timed_out": 0, "memory_killed": 0, "crashed": 0}
+        self._context = multiprocessing.get_context(start_method)
+        self._cond = threading.Condition()
+        self._idle: list[_Worker] = []
+        self._started = 0
+        self._closed = False
+
+    def _acquire(self) -> _Worker:
+        """Take an idle worker, start a new one below max_workers, else wait"""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Worker pool is shut down")
+                if self._idle:
+                    return self._idle.pop()
+                if self._started < self.max_workers:
+                    self._started += 1
+                    break
+                self._cond.wait()
+        try:
+            worker = _Worker(self._context)
+            self._count("started")
+            return worker
+        except BaseException:
+            with self._cond:
+                self._started -= 1
+                self._cond.notify()
+            raise
+
+    def _count(self, name: str) -> None:
+        with self._cond:
+            self.stats[name] += 1
+
+    def _should_recycle(self, worker: _Worker) -> bool:
+        """True if a worker has run its task quota or its RSS is past the recycle threshold"""
+        if self.max_tasks is not None and worker.tasks_done >= self.max_tasks:
+            return True
+        if self.recycle_rss is not None:
+            rss = worker.rss
+            return rss is not None and rss > self.recycle_rss
+        return False
+
+    def _release(self, worker: _Worker, reusable: bool) -> None:
+        recycle = reusable and self._should_recycle(worker)
+        with self._cond:
+            if reusable and not recycle and not self._closed:
+                self._idle.append(worker)
+                self._cond.notify()
+                return
+            self._started -= 1
+            self._cond.notify()
+        if recycle:
+            # A fresh process is started for the next task; the old heap goes back to the OS
+            self._count("recycled")
+            worker.stop()
+        else:
+            worker.kill()
+
+    def run(self,
+            fn: Callable,
+            *args,
+            progress_callback: Optional[Callable] = None,
+            timeout: Optional[float] = None):
+        """
+        Run ``fn(*args, progress_callback)`` on a worker and return its result
+
+        Waits for a free worker first; the timeout counts from the start
+        on the worker (default: the pool timeout).
+
+        Raises:
+            WorkerError: The task raised an exception
+            JobTimeout: The task passed its timeout (the worker is killed)
+            MemoryLimitExceeded: The worker passed the memory ceiling (the worker is killed)
+            WorkerCrashed: The worker process died
+        """
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._acquire()
+        reusable = False
+        try:
+            worker.conn.send((fn, args))
+            deadline = None if timeout is None else time.monotonic() + timeout
+
+            while True:
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._count("timed_out")
+                    raise JobTimeout(f"Conversion timed out after {timeout:g} s")
+                self._watchdog(worker)
+                if not worker.conn.poll(POLL_INTERVAL):
+                    continue
+
+                kind, *payload = worker.conn.recv()
+                if kind == "progress":
+                    if progress_callback:
+                        progress_callback(*payload)
+                    continue
+
+                worker.tasks_done += 1
+                reusable = True
+                if kind == "error":
+                    raise WorkerError(payload[0])
+                return payload[0]
+
+        except (EOFError, OSError):
+            worker.process.join(timeout=1.0)
+            self._count("crashed")
+            raise WorkerCrashed(f"Conversion worker exited unexpectedly (exit code {worker.process.exitcode})")
+        finally:
+            self._release(worker, reusable)
+
+    def _watchdog(self, worker: _Worker) -> None:
+        """Raise MemoryLimitExceeded if a busy worker is past the memory ceiling (it is then killed)"""
+        if self.memory_ceiling is None:
+            return
+        rss = worker.rss
+        if rss is not None and rss > self.memory_ceiling:
+            self._count("memory_killed")
+            raise MemoryLimitExceeded(
+                f"Conversion stopped: it used {rss // MB} MB, more than the "
+                f"{self.memory_ceiling // MB} MB limit per file"
+            )
+
+    def shutdown(self) -> None:
+        """Stop idle workers; busy workers are stopped when their task ends"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._started -= len(idle)
+            self._cond.notify_all()
+        for worker in idle:
+            worker.stop()